@@ -0,0 +1,96 @@
+"""Microbenchmark: FlowLayout time per resize step versus item count.
+
+    python benchmarks/bench_flowlayout.py --counts 100 500 1000 3000 --json flowlayout.json
+
+A resize drag is simulated by alternating heightForWidth() and setGeometry() over a sweep of
+widths. The same sweep runs against an uncached copy of the original layout for comparison.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QPoint, QRect, QSize
+from PyQt6.QtWidgets import QApplication, QLabel, QWidget
+
+from youtube_gui import FlowLayout
+
+
+class UncachedFlowLayout(FlowLayout):
+    """The pre-caching algorithm: three sizeHint() calls per item and no memoization."""
+
+    def heightForWidth(self, width):
+        return self._doLayout(QRect(0, 0, width, 0), True)
+
+    def minimumSize(self):
+        size = QSize()
+        for item in self.itemList:
+            size = size.expandedTo(item.minimumSize())
+        size += QSize(2 * self.contentsMargins().left(), 2 * self.contentsMargins().top())
+        return size
+
+    def _doLayout(self, rect, testOnly):
+        x = rect.x()
+        y = rect.y()
+        lineHeight = 0
+        spaceX = self.spacing()
+        spaceY = self.spacing()
+        for item in self.itemList:
+            nextX = x + item.sizeHint().width() + spaceX
+            if nextX - spaceX > rect.right() and lineHeight > 0:
+                x = rect.x()
+                y = y + lineHeight + spaceY
+                nextX = x + item.sizeHint().width() + spaceX
+                lineHeight = 0
+            if not testOnly:
+                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+            x = nextX
+            lineHeight = max(lineHeight, item.sizeHint().height())
+        return y + lineHeight - rect.y()
+
+
+def measure(layout_class, count, widths):
+    container = QWidget()
+    layout = layout_class(container, margin=0, spacing=8)
+    for i in range(count):
+        layout.addWidget(QLabel(f"keyword {i}"))
+    started = time.perf_counter()
+    for width in widths:
+        height = layout.heightForWidth(width)
+        layout.setGeometry(QRect(0, 0, width, height))
+        layout.minimumSize()
+    elapsed = time.perf_counter() - started
+    container.deleteLater()
+    return elapsed * 1000 / len(widths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument("--steps", type=int, default=60, help="Resize steps per measurement")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    # A drag passes over the same few widths repeatedly, which is what the caches target.
+    widths = [600 + (step % 20) * 15 for step in range(args.steps)]
+    results = []
+    print(f"{'items':>7} {'cached ms/step':>15} {'uncached ms/step':>17} {'speedup':>8}")
+    for count in args.counts:
+        cached = measure(FlowLayout, count, widths)
+        uncached = measure(UncachedFlowLayout, count, widths)
+        results.append({"items": count, "cached_ms_per_step": cached, "uncached_ms_per_step": uncached})
+        print(f"{count:>7} {cached:>15.3f} {uncached:>17.3f} {uncached / cached:>7.1f}x")
+        app.processEvents()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
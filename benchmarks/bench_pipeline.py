@@ -0,0 +1,184 @@
+"""End-to-end pipeline benchmark against a local stand-in YouTube API (no API key or network needed).
+
+    python benchmarks/bench_pipeline.py --latency-ms 50 --repeat 5 --json pipeline.json
+
+Starts benchmarks/fake_youtube.py in-process and times, on the offscreen Qt platform:
+  worker_run       YouTubeWorker.run for a 1-page and a 3-page search (API round trips + analysis)
+  analyze          YouTubeResearcher.analyze_video_data at 20, 1k and 100k videos
+  thumbnails       ThumbnailLoader fetching and scaling tiles, cold and from the disk cache
+  display_results  YouTubeOptimizerApp.display_results for 20 and 1k titles, including layout
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_youtube import FakeYouTube, synthetic_videos
+
+
+def timed(fn, repeat):
+    """Median and min wall time of `fn()` in ms over `repeat` runs."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "min_ms": round(min(samples), 3), "runs": len(samples)}
+
+
+def bench_worker(repeat):
+    from youtube_core import YouTubeResearcher, open_scheduler
+    from youtube_gui import YouTubeWorker
+    scheduler = open_scheduler()
+    results = {}
+    counter = iter(range(10 ** 9))
+
+    def run(pages):
+        # A fresh topic per run keeps every call a real round trip; no response cache is used.
+        worker = YouTubeWorker(YouTubeResearcher(scheduler), f"bench topic {next(counter)}",
+                               max_results=20 if pages == 1 else 50, pages=pages)
+        outcome = []
+        worker.finished.connect(outcome.append)
+        worker.error.connect(lambda message: outcome.append(message))
+        worker.run()
+        if not outcome or not isinstance(outcome[0], dict):
+            raise RuntimeError(f"Worker failed: {outcome}")
+
+    run(1)  # Builds the API client once so it is not counted below.
+    for pages in (1, 3):
+        results[f"pages_{pages}"] = timed(lambda: run(pages), repeat)
+    return results
+
+
+def bench_analyze(sizes, repeat, base_url):
+    from youtube_core import YouTubeResearcher, parse_video
+    researcher = YouTubeResearcher(None)
+    corpus = [parse_video(item) for item in synthetic_videos(max(sizes), base_url)]
+    results = {}
+    for size in sizes:
+        videos = corpus[:size]
+        results[str(size)] = timed(lambda: researcher.analyze_video_data(videos), 1 if size >= 100000 else repeat)
+    return results
+
+
+def _wait_for_tiles(app, loader, urls, timeout=30):
+    pending = set(urls)
+    done = lambda generation, url, *rest: pending.discard(url)
+    loader.loaded.connect(done)
+    loader.failed.connect(done)
+    generation = loader.new_generation()
+    for url in urls:
+        loader.load(url, generation)
+    deadline = time.perf_counter() + timeout
+    while pending and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    loader.loaded.disconnect(done)
+    loader.failed.disconnect(done)
+    if pending:
+        raise RuntimeError(f"{len(pending)} thumbnails did not load")
+
+
+def bench_thumbnails(app, count, repeat, base_url, cache_dir):
+    from youtube_core import ThumbnailCache
+    from youtube_gui import ThumbnailLoader
+    urls = [f"{base_url}/vi/thumb{i:05d}/hqdefault.jpg" for i in range(count)]
+    results = {}
+    loader = ThumbnailLoader()
+    results["cold"] = timed(lambda: _wait_for_tiles(app, loader, urls), repeat)
+    loader.shutdown()
+    cache = ThumbnailCache(os.path.join(cache_dir, "bench_thumbnails"), 64 * 1024 * 1024)
+    loader = ThumbnailLoader(cache=cache)
+    _wait_for_tiles(app, loader, urls)
+    results["disk_cached"] = timed(lambda: _wait_for_tiles(app, loader, urls), repeat)
+    loader.shutdown()
+    return results
+
+
+def bench_display(app, repeat, base_url):
+    from youtube_core import YouTubeResearcher, parse_video
+    from youtube_gui import YouTubeOptimizerApp
+    window = YouTubeOptimizerApp()
+    window.resize(1100, 760)
+    window.show()
+    researcher = YouTubeResearcher(None)
+    results = {}
+    for size in (20, 1000):
+        videos = [parse_video(item) for item in synthetic_videos(size, base_url, prefix=f"display{size}-")]
+        suggestions = researcher.analyze_video_data(videos, max_titles=None)
+
+        def render():
+            window.display_results(suggestions)
+            app.processEvents()
+
+        results[str(size)] = timed(render, repeat)
+    window.thumbnail_loader.shutdown()
+    window.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50, help="Added to every fake API response")
+    parser.add_argument("--cdn-latency-ms", type=float, default=20, help="Added to every fake thumbnail response")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 1000, 100000], help="Video counts for analyze")
+    parser.add_argument("--thumbnails", type=int, default=50, help="Thumbnails per load")
+    parser.add_argument("--only", nargs="+", choices=["worker_run", "analyze", "thumbnails", "display_results"])
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    fake = FakeYouTube(latency=args.latency_ms / 1000, cdn_latency=args.cdn_latency_ms / 1000).start()
+    # Removed when the run ends, so repeated runs don't pile up response and thumbnail caches.
+    tmp_dir = tempfile.TemporaryDirectory(prefix="bench_pipeline_")
+    cache_dir = tmp_dir.name
+    # Read by youtube_core at import time, so they are set before anything imports it.
+    os.environ.update({
+        "YOUTUBE_DISCOVERY_URL": fake.discovery_url,
+        "YOUTUBE_CACHE_DIR": cache_dir,
+        "YOUTUBE_API_KEY": "bench",
+        "YOUTUBE_API_RPS": "10000",
+        "YOUTUBE_DAILY_QUOTA": str(10 ** 9),
+    })
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+
+    selected = args.only or ["worker_run", "analyze", "thumbnails", "display_results"]
+    results = {"config": {
+        "latency_ms": args.latency_ms, "cdn_latency_ms": args.cdn_latency_ms, "repeat": args.repeat,
+        "python": sys.version.split()[0], "platform": sys.platform,
+    }}
+    try:
+        if "worker_run" in selected:
+            results["worker_run"] = bench_worker(args.repeat)
+        if "analyze" in selected:
+            results["analyze"] = bench_analyze(args.sizes, args.repeat, fake.base_url)
+        if "thumbnails" in selected:
+            results["thumbnails"] = bench_thumbnails(app, args.thumbnails, args.repeat, fake.base_url, cache_dir)
+        if "display_results" in selected:
+            results["display_results"] = bench_display(app, args.repeat, fake.base_url)
+    finally:
+        fake.stop()
+        tmp_dir.cleanup()
+    results["requests"] = fake.requests
+    results["bytes_sent"] = fake.bytes_sent
+
+    for section in selected:
+        for case, timing in results[section].items():
+            print(f"{section:>16} {case:>12}: median {timing['median_ms']:9.1f} ms, min {timing['min_ms']:9.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
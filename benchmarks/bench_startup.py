@@ -0,0 +1,68 @@
+"""Measures GUI cold start: time until the window takes input and until the API client is ready.
+
+    python benchmarks/bench_startup.py --runs 5 --json startup.json --max-interactive-ms 1000
+
+Each run launches `youtube.py` in a fresh process on the offscreen Qt platform with
+YOUTUBE_STARTUP_TIMING=1 and reads the timings it prints to stderr.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKS = ("window_interactive", "api_ready")
+
+
+def run_once(cache_dir, timeout=30):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", YOUTUBE_STARTUP_TIMING="1", YOUTUBE_CACHE_DIR=cache_dir)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "youtube.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    timings = {}
+    try:
+        for line in process.stderr:
+            if line.startswith("startup: "):
+                _, name, value, _ = line.split()
+                timings[name] = float(value)
+                if all(mark in timings for mark in MARKS):
+                    break
+    finally:
+        process.kill()
+        process.wait(timeout)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--max-interactive-ms", type=float, help="Exit non-zero if the median exceeds this")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # The first run populates the discovery cache; it is reported separately as the cold start.
+        cold = run_once(cache_dir)
+        warm = [run_once(cache_dir) for _ in range(args.runs)]
+
+    results = {"cold": cold, "warm_median": {
+        mark: statistics.median(run[mark] for run in warm if mark in run) for mark in MARKS
+    }, "runs": warm}
+    for mark in MARKS:
+        print(f"{mark:>20}: cold {cold.get(mark, float('nan')):7.0f} ms, "
+              f"warm median {results['warm_median'][mark]:7.0f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.max_interactive_ms and results["warm_median"]["window_interactive"] > args.max_interactive_ms:
+        print(f"Regression: window_interactive above {args.max_interactive_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""Local stand-in for the YouTube Data API v3 and its thumbnail CDN, for benchmarks.
+
+    python benchmarks/fake_youtube.py --port 8765 --latency-ms 80
+
+Serves the discovery document (rewritten to point back at this server), `search`,
+`videos` and `channels` with deterministic synthetic payloads, and generated JPEG thumbnails under
+/vi/<id>/<variant>.jpg (YouTube's default, mqdefault and hqdefault sizes). API responses honor `fields=` masks and are gzipped when the client
+accepts it, like the real API. Run the app against it with
+YOUTUBE_DISCOVERY_URL=http://127.0.0.1:8765/discovery/v1/apis/youtube/v3/rest and a
+fresh YOUTUBE_CACHE_DIR.
+"""
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WORDS = """
+review unboxing camera battery test vs best budget pro ultra max mini phone laptop tablet gaming
+setup tips guide tutorial beginner 2024 2025 honest long term first look hands on comparison
+worth it buying should you buy problems fixed update new leaked price specs zoom night mode
+""".split()
+
+
+THUMBNAIL_VARIANTS = {"default": (120, 90), "mqdefault": (320, 180), "hqdefault": (480, 360)}
+
+
+def synthetic_video(video_id, base_url):
+    """Deterministic fake videos().list item for `video_id`."""
+    rng = random.Random(zlib.crc32(video_id.encode("utf-8")))
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).title()
+    return {
+        "kind": "youtube#video",
+        "id": video_id,
+        "snippet": {
+            "publishedAt": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "channelId": f"UC{rng.randint(0, 199):022d}",
+            "title": title,
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+            "channelTitle": f"Channel {rng.randint(0, 199)}",
+            "thumbnails": {
+                size: {"url": f"{base_url}/vi/{video_id}/{variant}.jpg", "width": w, "height": h}
+                for size, (variant, (w, h)) in zip(("default", "medium", "high"), THUMBNAIL_VARIANTS.items())
+            },
+            "tags": rng.sample(WORDS, rng.randint(0, 12)),
+        },
+        "statistics": {
+            "viewCount": str(int(rng.paretovariate(1.2) * 1000)),
+            "likeCount": str(rng.randint(0, 50000)),
+            "commentCount": str(rng.randint(0, 5000)),
+        },
+    }
+
+
+def synthetic_channel(channel_id):
+    """Deterministic fake channels().list item; about one channel in ten hides its subscriber count."""
+    rng = random.Random(zlib.crc32(channel_id.encode("utf-8")))
+    hidden = rng.random() < 0.1
+    statistics = {"viewCount": str(rng.randint(10 ** 4, 10 ** 9)), "hiddenSubscriberCount": hidden,
+                  "videoCount": str(rng.randint(1, 3000))}
+    if not hidden:
+        statistics["subscriberCount"] = str(int(rng.paretovariate(1.1) * 500))
+    return {"kind": "youtube#channel", "id": channel_id, "statistics": statistics}
+
+
+def synthetic_videos(count, base_url, prefix="bench"):
+    return [synthetic_video(f"{prefix}{i:07d}", base_url) for i in range(count)]
+
+
+def parse_fields(spec, pos=0):
+    """Parses a partial-response mask like "a,b/c,d(e,f)" into a nested dict; leaves are True."""
+    tree = {}
+    while pos < len(spec) and spec[pos] != ")":
+        end = pos
+        while end < len(spec) and spec[end] not in ",()":
+            end += 1
+        node = tree
+        *parents, name = spec[pos:end].strip().split("/")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        if end < len(spec) and spec[end] == "(":
+            children, end = parse_fields(spec, end + 1)
+            node.setdefault(name, {}).update(children)
+            end += 1
+        else:
+            node[name] = True
+        pos = end + 1 if end < len(spec) and spec[end] == "," else end
+    return (tree, pos) if pos < len(spec) else tree
+
+
+def apply_fields(value, tree):
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: apply_fields(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def make_jpeg(width, height, seed):
+    """A small gradient JPEG, generated with Qt so the benchmark needs no extra imaging library.
+
+    4:3 sizes letterbox a 16:9 frame between black bars, as YouTube's do.
+    """
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt6.QtGui import QColor, QImage, QLinearGradient, QPainter
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(0, 0, 0))
+    frame_height = min(height, round(width * 9 / 16))
+    top = (height - frame_height) // 2
+    rng = random.Random(seed)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, top, width, top + frame_height)
+    gradient.setColorAt(0, QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    gradient.setColorAt(1, QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter.fillRect(0, top, width, frame_height, gradient)
+    painter.end()
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPEG", 85)
+    return bytes(data)
+
+
+class FakeYouTube:
+    """Threaded HTTP server; `latency` is added to every API response, `cdn_latency` to thumbnails."""
+
+    def __init__(self, port=0, latency=0.05, cdn_latency=0.02, page_size=50, max_pages=10):
+        self.latency = latency
+        self.cdn_latency = cdn_latency
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.requests = {}
+        self.bytes_sent = {}
+        self._jpegs = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._discovery = None
+        self._thread = None
+
+    @property
+    def discovery_url(self):
+        return f"{self.base_url}/discovery/v1/apis/youtube/v3/rest"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name, size=0):
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            self.bytes_sent[name] = self.bytes_sent.get(name, 0) + size
+
+    def discovery(self):
+        if self._discovery is None:
+            from googleapiclient.discovery_cache import get_static_doc
+            document = json.loads(get_static_doc("youtube", "v3"))
+            for key in ("rootUrl", "baseUrl", "mtlsRootUrl"):
+                document[key] = self.base_url + "/"
+            self._discovery = json.dumps(document).encode("utf-8")
+        return self._discovery
+
+    def search(self, query):
+        q = query.get("q", [""])[0]
+        page = int(query.get("pageToken", ["0"])[0] or 0)
+        size = min(int(query.get("maxResults", ["5"])[0]), self.page_size)
+        prefix = f"{zlib.crc32(q.encode('utf-8')):08x}"
+        body = {
+            "kind": "youtube#searchListResponse",
+            "pageInfo": {"totalResults": size * self.max_pages, "resultsPerPage": size},
+            "items": [{"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": f"{prefix}-{page}-{i}"}}
+                      for i in range(size)],
+        }
+        if page + 1 < self.max_pages:
+            body["nextPageToken"] = str(page + 1)
+        return body
+
+    def videos(self, query):
+        ids = [video_id for video_id in query.get("id", [""])[0].split(",") if video_id]
+        return {"kind": "youtube#videoListResponse", "items": [synthetic_video(i, self.base_url) for i in ids]}
+
+    def channels(self, query):
+        ids = [channel_id for channel_id in query.get("id", [""])[0].split(",") if channel_id]
+        return {"kind": "youtube#channelListResponse", "items": [synthetic_channel(i) for i in ids]}
+
+    def thumbnail(self, video_id, size):
+        width, height = THUMBNAIL_VARIANTS.get(size, (480, 360))
+        # A handful of distinct images is enough; decoding cost depends on size, not content.
+        key = (zlib.crc32(video_id.encode("utf-8")) % 16, width, height)
+        with self._lock:
+            if key not in self._jpegs:
+                self._jpegs[key] = make_jpeg(width, height, key[0])
+            return self._jpegs[key]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if content_type == "application/json" and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, 6)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return len(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                if url.path.startswith("/discovery/"):
+                    fake._count("discovery")
+                    return self._send(200, fake.discovery())
+                if parts[0] == "vi" and len(parts) == 3:
+                    time.sleep(fake.cdn_latency)
+                    size = self._send(200, fake.thumbnail(parts[1], parts[2].rsplit(".", 1)[0]), "image/jpeg")
+                    return fake._count("thumbnail", size)
+                endpoint = parts[-1]
+                if endpoint in ("search", "videos", "channels"):
+                    time.sleep(fake.latency)
+                    body = getattr(fake, endpoint)(query)
+                    if "fields" in query:
+                        body = apply_fields(body, parse_fields(query["fields"][0]))
+                    size = self._send(200, json.dumps(body).encode("utf-8"))
+                    return fake._count(endpoint, size)
+                self._send(404, b'{"error": {"code": 404, "message": "Not found", "errors": []}}')
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--cdn-latency-ms", type=float, default=20)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--max-pages", type=int, default=10)
+    args = parser.parse_args(argv)
+    fake = FakeYouTube(args.port, args.latency_ms / 1000, args.cdn_latency_ms / 1000, args.page_size, args.max_pages)
+    print(f"Serving on {fake.base_url}\nYOUTUBE_DISCOVERY_URL={fake.discovery_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
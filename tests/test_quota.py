@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import youtube_quota
+from youtube_quota import QuotaExceededError, QuotaScheduler, TokenBucket
+
+
+class FakeRequest:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def execute(self):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def http_error(status, reason=""):
+    import httplib2
+    from googleapiclient.errors import HttpError
+    body = {"error": {"code": status, "message": reason, "errors": [{"reason": reason}] if reason else []}}
+    return HttpError(httplib2.Response({"status": status}), json.dumps(body).encode("utf-8"))
+
+
+def run(scheduler, outcomes, endpoint="search"):
+    """Executes one call whose attempts end in `outcomes`, in order."""
+    outcomes = iter(outcomes)
+    return scheduler.execute(endpoint, lambda service: FakeRequest(next(outcomes)))
+
+
+@pytest.fixture
+def day(monkeypatch):
+    """The quota day, settable by the test; retries never sleep."""
+    current = ["2024-03-09"]
+    monkeypatch.setattr(youtube_quota, "quota_day", lambda: current[0])
+    monkeypatch.setattr(youtube_quota.time, "sleep", lambda seconds: None)
+    return current
+
+
+def make_scheduler(tmp_path, keys=("key",), **kwargs):
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    return QuotaScheduler(list(keys), lambda key: key, state_path=str(tmp_path / "quota.sqlite3"), **kwargs)
+
+
+def test_reserve_and_release_within_a_day(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, daily_quota=1000)
+    key, reserved_day = scheduler._reserve(100, background=False)
+    assert reserved_day == "2024-03-09"
+    assert scheduler.remaining() == 900
+    scheduler._release(key, 100, reserved_day)
+    assert scheduler.remaining() == 1000
+
+
+def test_day_rollover_resets_spend_and_exhaustion(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, daily_quota=1000)
+    key, _ = scheduler._reserve(100, background=False)
+    scheduler._mark_exhausted(key)
+    assert scheduler.remaining() == 0
+    day[0] = "2024-03-10"
+    assert scheduler.remaining() == 1000
+    assert scheduler.stats()["exhausted_keys"] == 0
+
+
+def test_release_after_rollover_does_not_refund_today(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, daily_quota=1000)
+    key, reserved_day = scheduler._reserve(100, background=False)
+    day[0] = "2024-03-10"
+    scheduler._reserve(1, background=False)
+    scheduler._release(key, 100, reserved_day)
+    assert scheduler.stats()["spent"] == 1
+
+
+def test_spend_is_shared_between_schedulers(tmp_path, day):
+    first = make_scheduler(tmp_path, daily_quota=1000)
+    second = make_scheduler(tmp_path, daily_quota=1000)
+    run(first, [{}])
+    run(second, [{}], endpoint="videos")
+    assert first.stats()["spent"] == second.stats()["spent"] == 101
+    assert make_scheduler(tmp_path, daily_quota=1000).remaining() == 899
+
+
+def test_background_calls_keep_the_reserve(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, daily_quota=1000, reserve_units=950)
+    assert not scheduler.can_afford("search", background=True)
+    with pytest.raises(QuotaExceededError):
+        scheduler.execute("search", lambda service: FakeRequest({}), background=True)
+    assert run(scheduler, [{"ok": True}]) == {"ok": True}
+
+
+def test_transport_errors_are_retried_and_refunded(tmp_path, day):
+    scheduler = make_scheduler(tmp_path)
+    assert run(scheduler, [ConnectionResetError(), TimeoutError(), {"ok": True}]) == {"ok": True}
+    assert scheduler.stats()["spent"] == 100
+
+
+def test_transport_errors_past_max_retries_raise_with_nothing_spent(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, max_retries=2)
+    with pytest.raises(ConnectionResetError):
+        run(scheduler, [ConnectionResetError()] * 3)
+    assert scheduler.stats()["spent"] == 0
+
+
+def test_server_errors_are_retried_and_charged(tmp_path, day):
+    scheduler = make_scheduler(tmp_path)
+    assert run(scheduler, [http_error(503), http_error(429), {"ok": True}], endpoint="videos") == {"ok": True}
+    assert scheduler.stats()["spent"] == 3
+
+
+def test_client_errors_are_not_retried(tmp_path, day):
+    scheduler = make_scheduler(tmp_path)
+    with pytest.raises(Exception) as raised:
+        run(scheduler, [http_error(400, "badRequest"), {"ok": True}])
+    assert raised.value.resp.status == 400
+    assert scheduler.stats()["spent"] == 100
+
+
+def test_quota_exceeded_moves_to_the_next_key(tmp_path, day):
+    scheduler = make_scheduler(tmp_path, keys=("a", "b"), daily_quota=1000)
+    used = []
+    outcomes = iter([http_error(403, "quotaExceeded"), {"ok": True}])
+
+    def factory(service):
+        used.append(service)
+        return FakeRequest(next(outcomes))
+
+    assert scheduler.execute("search", factory) == {"ok": True}
+    assert used[0] != used[1]
+    assert scheduler.remaining_by_key()[scheduler._key_id(used[0])] == 0
+
+
+def test_token_bucket_waits_for_refill(monkeypatch):
+    clock = [0.0]
+    slept = []
+    monkeypatch.setattr(youtube_quota.time, "monotonic", lambda: clock[0])
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(youtube_quota.time, "sleep", sleep)
+    bucket = TokenBucket(rate=2, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert slept == []
+    bucket.acquire()
+    assert slept == [pytest.approx(0.5)]
+
+
+def test_thread_units_meter_only_the_calling_thread(tmp_path, day):
+    scheduler = make_scheduler(tmp_path)
+    run(scheduler, [ConnectionResetError(), {}])
+    worker = threading.Thread(target=run, args=(scheduler, [{}], "videos"))
+    worker.start()
+    worker.join()
+    assert scheduler.thread_units() == 100
+    assert scheduler.stats()["spent"] == 101
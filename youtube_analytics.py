@@ -0,0 +1,287 @@
+import re
+import time
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)?", re.UNICODE)
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from get got had has
+have he her his how i if in into is it its just me more most my new no not now of on one or our out so
+some than that the their them then there these they this to too up us vs was we were what when which who
+why will with you your
+http https www com youtube watch bit ly
+""".split())
+
+
+def _view_counts(videos):
+    return np.fromiter((v.views or 0 for v in videos), dtype=np.int64, count=len(videos))
+
+
+def _published_times(videos):
+    """Publish times as Unix seconds, NaN where unknown."""
+    # RFC 3339 with a "Z" suffix; numpy wants naive timestamps.
+    stamps = np.array([(v.published_at or "")[:19] or "NaT" for v in videos], dtype="datetime64[s]")
+    seconds = stamps.astype(np.int64).astype(np.float64)
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def _flatten(lists):
+    """Flattens per-document lists into (values, document index) arrays."""
+    lengths = np.fromiter((len(values) for values in lists), dtype=np.int64, count=len(lists))
+    values = [value for values_ in lists for value in values_]
+    doc_ids = np.repeat(np.arange(len(lists), dtype=np.int64), lengths)
+    return values, doc_ids
+
+
+def _encode(values, index):
+    """Maps strings to dense integer ids, numbered in first-seen order."""
+    for value in dict.fromkeys(values):
+        if value not in index:
+            index[value] = len(index)
+    return np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+
+
+def _vocab_array(index):
+    vocab = np.empty(len(index), dtype=object)
+    vocab[:] = list(index)
+    return vocab
+
+
+def _unique_pairs(doc_ids, item_ids, n_items):
+    """Drops repeats of the same item within a document."""
+    if not len(item_ids):
+        return doc_ids, item_ids
+    keys = np.sort(doc_ids * n_items + item_ids)
+    keep = np.empty(len(keys), dtype=bool)
+    keep[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+    keys = keys[keep]
+    return keys // n_items, keys % n_items
+
+
+def _top(labels, scores, limit, min_score=0):
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return [(str(labels[i]), float(scores[i])) for i in order if scores[i] > min_score]
+
+
+class VideoColumns:
+    """Columnar view of fetched videos: one array per field plus flattened token/tag arrays.
+
+    Strings are interned into vocabularies once; every score below is then integer array math.
+    """
+
+    def __init__(self, videos):
+        self.size = len(videos)
+        self.titles = [v.title for v in videos]
+        self.channels = [v.channel_title for v in videos]
+        self.thumbnails = [v.thumbnail_high for v in videos]
+        self.raw_views = [v.view_count for v in videos]
+        self.views = _view_counts(videos)
+        self.subscribers = np.fromiter((v.subscribers or np.nan for v in videos), dtype=np.float64, count=self.size)
+        self.published = _published_times(videos)
+
+        tags = [[tag.lower() for tag in v.tags if tag and len(tag.strip()) > 1] for v in videos]
+        tag_values, self.tag_doc_ids = _flatten(tags)
+        tag_index = {}
+        self.tag_ids = _encode(tag_values, tag_index)
+        self.tag_vocab = _vocab_array(tag_index)
+
+        term_index = {}
+        title_values, self.title_doc_ids = _flatten([tokenize(title) for title in self.titles])
+        description_values, description_doc_ids = _flatten([tokenize(v.description) for v in videos])
+        self.title_term_ids = _encode(title_values, term_index)
+        description_term_ids = _encode(description_values, term_index)
+        self.term_vocab = _vocab_array(term_index)
+        n_terms = len(self.term_vocab)
+        self.stop_terms = np.fromiter((term in STOPWORDS for term in term_index), dtype=bool, count=n_terms)
+        # Single characters never help; bare numbers only matter inside phrases ("iphone 15 pro").
+        self.short_terms = np.fromiter((len(term) < 2 for term in term_index), dtype=bool, count=n_terms)
+        numeric_terms = np.fromiter((term.isdigit() for term in term_index), dtype=bool, count=n_terms)
+
+        text_term_ids = np.concatenate([self.title_term_ids, description_term_ids])
+        text_doc_ids = np.concatenate([self.title_doc_ids, description_doc_ids])
+        keep = ~(self.short_terms | numeric_terms)[text_term_ids]
+        self.text_term_ids = text_term_ids[keep]
+        self.text_doc_ids = text_doc_ids[keep]
+        self.text_lengths = np.bincount(self.text_doc_ids, minlength=self.size)
+
+
+def rank_titles(columns, max_titles=10, scores=None):
+    """Unique titles as (title, views, channel), most-viewed first.
+
+    With `scores`, titles are ordered by them instead, each tuple gains the score, and
+    videos with a NaN score are left out.
+    """
+    order = np.argsort(-(columns.views if scores is None else scores), kind="stable")
+    seen = set()
+    ranked = []
+    for i in order:
+        if scores is not None and np.isnan(scores[i]):
+            break
+        title = columns.titles[i]
+        if title not in seen:
+            seen.add(title)
+            row = (title, columns.raw_views[i], columns.channels[i])
+            ranked.append(row if scores is None else row + (round(float(scores[i]), 4),))
+            if max_titles is not None and len(ranked) >= max_titles:
+                break
+    return ranked
+
+
+def views_per_subscriber(columns):
+    """How far each video outran its channel's audience; NaN when the subscriber count is unknown."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(columns.subscribers > 0, columns.views / columns.subscribers, np.nan)
+
+
+def views_per_day(columns, now=None):
+    """Views divided by days since publishing, counting anything under a day as one day."""
+    now = time.time() if now is None else now
+    return columns.views / np.maximum((now - columns.published) / 86400, 1.0)
+
+
+def tag_frequency(columns, limit=15):
+    # Ids are in first-seen order, so a stable sort breaks count ties like Counter.most_common.
+    counts = np.bincount(columns.tag_ids, minlength=len(columns.tag_vocab))
+    order = np.argsort(-counts, kind="stable")[:limit]
+    return [str(columns.tag_vocab[i]) for i in order]
+
+
+def view_weighted_tags(columns, limit=15):
+    """Scores each tag by the log views of the videos using it, counting a tag once per video."""
+    doc_ids, tag_ids = _unique_pairs(columns.tag_doc_ids, columns.tag_ids, max(1, len(columns.tag_vocab)))
+    weights = np.log1p(columns.views.astype(np.float64))[doc_ids]
+    scores = np.bincount(tag_ids, weights=weights, minlength=len(columns.tag_vocab))
+    return _top(columns.tag_vocab, scores, limit)
+
+
+def tfidf_terms(columns, limit=20):
+    """Ranks title+description terms by TF-IDF summed over the corpus (stopwords excluded)."""
+    n_terms = len(columns.term_vocab)
+    if not n_terms:
+        return []
+    term_ids = columns.text_term_ids
+    doc_ids = columns.text_doc_ids
+    _, unique_terms = _unique_pairs(doc_ids, term_ids, n_terms)
+    df = np.bincount(unique_terms, minlength=n_terms)
+    idf = np.log((1 + columns.size) / (1 + df)) + 1
+    lengths = np.maximum(columns.text_lengths, 1)[doc_ids]
+    scores = np.bincount(term_ids, weights=1.0 / lengths, minlength=n_terms) * idf
+    scores[columns.stop_terms] = 0
+    return _top(columns.term_vocab, scores, limit)
+
+
+def top_ngrams(columns, n, limit=15):
+    """Most common n-word title phrases, counted once per title, never spanning two titles."""
+    term_ids = columns.title_term_ids
+    doc_ids = columns.title_doc_ids
+    if len(term_ids) < n:
+        return []
+    span = len(term_ids) - n + 1
+    valid = doc_ids[:span] == doc_ids[n - 1:]
+    # Phrases that start or end on a stopword ("review of", "the best") carry little signal.
+    valid &= ~columns.stop_terms[term_ids[:span]] & ~columns.stop_terms[term_ids[n - 1:]]
+    for offset in range(n):
+        valid &= ~columns.short_terms[term_ids[offset:offset + span]]
+    positions = np.flatnonzero(valid)
+    if not len(positions):
+        return []
+    # Codes are packed over the title-only vocabulary (descriptions would inflate it); if even
+    # that could overflow int64, phrases are numbered by np.unique over their rows instead.
+    title_terms, local_ids = np.unique(term_ids, return_inverse=True)
+    grams = np.stack([local_ids[positions + offset] for offset in range(n)], axis=1)
+    if len(title_terms) ** n < 2 ** 63:
+        codes = np.zeros(len(positions), dtype=np.int64)
+        for offset in range(n):
+            codes = codes * len(title_terms) + grams[:, offset]
+    else:
+        codes = np.unique(grams, axis=0, return_inverse=True)[1].reshape(-1).astype(np.int64)
+    docs = doc_ids[positions]
+    order = np.lexsort((docs, codes))
+    codes = codes[order]
+    docs = docs[order]
+    positions = positions[order]
+    first_in_title = np.empty(len(codes), dtype=bool)
+    first_in_title[0] = True
+    first_in_title[1:] = (codes[1:] != codes[:-1]) | (docs[1:] != docs[:-1])
+    codes = codes[first_in_title]
+    positions = positions[first_in_title]
+    starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+    counts = np.diff(np.append(starts, len(codes)))
+    phrases = []
+    for i in np.argsort(-counts, kind="stable")[:limit]:
+        if counts[i] < 2:
+            break
+        start = positions[starts[i]]
+        words = [str(columns.term_vocab[term]) for term in term_ids[start:start + n]]
+        phrases.append((" ".join(words), int(counts[i])))
+    return phrases
+
+
+def analyze_videos(videos, max_titles=10):
+    columns = VideoColumns(videos)
+    return {
+        "title_suggestions": rank_titles(columns, max_titles),
+        "titles_by_views_per_subscriber": rank_titles(columns, max_titles, views_per_subscriber(columns)),
+        "titles_by_views_per_day": rank_titles(columns, max_titles, views_per_day(columns)),
+        "keyword_suggestions": tag_frequency(columns),
+        # Most-viewed first, so near-duplicate thumbnails collapse onto the best-performing copy.
+        "thumbnail_urls": list(dict.fromkeys(columns.thumbnails[i] for i in np.argsort(-columns.views, kind="stable"))),
+        "weighted_keywords": view_weighted_tags(columns),
+        "tfidf_keywords": tfidf_terms(columns),
+        "top_bigrams": top_ngrams(columns, 2),
+        "top_trigrams": top_ngrams(columns, 3),
+    }
+
+
+def _tag_set(video):
+    return {tag.lower() for tag in video.tags if tag and len(tag.strip()) > 1}
+
+
+def compare_topics(videos_by_topic, top_tags=15, shared_tags=5):
+    """Side-by-side summary of several topics' results: view statistics, pairwise tag
+    overlap (Jaccard) and channels that rank for more than one topic."""
+    topics = list(videos_by_topic)
+    summaries = []
+    tag_sets = []
+    channel_topics = {}
+    for topic in topics:
+        videos = videos_by_topic[topic]
+        columns = VideoColumns(videos)
+        summaries.append({
+            "topic": topic,
+            "videos": columns.size,
+            "median_views": float(np.median(columns.views)) if columns.size else 0.0,
+            "total_views": int(columns.views.sum()),
+            "top_tags": tag_frequency(columns, top_tags),
+            "channels": len(set(columns.channels)),
+        })
+        tag_sets.append(set().union(*map(_tag_set, videos)) if videos else set())
+        for channel in set(columns.channels):
+            channel_topics.setdefault(channel, []).append(topic)
+
+    overlap = np.eye(len(topics))
+    pairs = []
+    for i in range(len(topics)):
+        for j in range(i + 1, len(topics)):
+            union = tag_sets[i] | tag_sets[j]
+            common = tag_sets[i] & tag_sets[j]
+            overlap[i, j] = overlap[j, i] = len(common) / len(union) if union else 0.0
+            ranked = [tag for tag in summaries[i]["top_tags"] + summaries[j]["top_tags"] if tag in common]
+            pairs.append({"topics": [topics[i], topics[j]], "jaccard": float(overlap[i, j]),
+                          "shared_tags": list(dict.fromkeys(ranked))[:shared_tags]})
+    shared_channels = sorted(
+        ((channel, names) for channel, names in channel_topics.items() if len(names) > 1),
+        key=lambda item: (-len(item[1]), item[0])
+    )
+    return {
+        "topics": summaries,
+        "tag_overlap": overlap.tolist(),
+        "tag_pairs": sorted(pairs, key=lambda pair: -pair["jaccard"]),
+        "shared_channels": [{"channel": channel, "topics": names} for channel, names in shared_channels],
+    }
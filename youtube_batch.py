@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from youtube_core import YouTubeResearcher, open_research_store, open_response_cache, open_scheduler
+from youtube_quota import QuotaExceededError
+
+
+def read_topics(path):
+    """Reads one topic per line, skipping blanks, '#' comments and repeats."""
+    topics = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            topic = line.strip()
+            if topic and not topic.startswith("#") and topic not in seen:
+                seen.add(topic)
+                topics.append(topic)
+    return topics
+
+
+def load_completed_topics(out_path, retry=()):
+    """Returns topics already written without an error.
+
+    Error records are dropped when the topic has since succeeded or is in `retry`, so a
+    resumed run leaves one record per topic. A crash can leave a half-written last line;
+    it is dropped too, so appended records stay one per line.
+    """
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, "rb") as f:
+        data = f.read()
+    lines = data.splitlines(keepends=True)
+    if lines and not lines[-1].endswith(b"\n"):
+        lines.pop()
+    records = []
+    for line in lines:
+        try:
+            records.append((line, json.loads(line)))
+        except ValueError:
+            records.append((line, None))
+    completed = {record.get("topic") for _, record in records if record is not None and "error" not in record}
+    superseded = completed.union(retry)
+    kept = b"".join(line for line, record in records
+                    if record is None or "error" not in record or record.get("topic") not in superseded)
+    if kept != data:
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(kept)
+        os.replace(tmp_path, out_path)
+    return completed
+
+
+class BatchRunner:
+    def __init__(self, concurrency=8, max_results=20, pages=1, use_cache=True, record_history=True):
+        self.concurrency = concurrency
+        self.max_results = max_results
+        self.pages = pages
+        self.scheduler = open_scheduler()
+        self.researcher = YouTubeResearcher(
+            self.scheduler,
+            open_response_cache() if use_cache else None,
+            open_research_store() if record_history else None
+        )
+        self.quota_exhausted = threading.Event()
+
+    def research_topic(self, topic):
+        """Returns the topic's JSON record, or None if it was skipped for lack of quota."""
+        if self.quota_exhausted.is_set():
+            return None
+        started = time.time()
+        record = {"topic": topic}
+        try:
+            record.update(self.researcher.research(topic, max_results=self.max_results, pages=self.pages))
+        except QuotaExceededError:
+            # Leave the topic out of the output so a resumed run picks it up once quota resets.
+            self.quota_exhausted.set()
+            return None
+        except Exception as e:
+            record["error"] = str(e)
+        record["fetched_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started))
+        record["elapsed_s"] = round(time.time() - started, 3)
+        return record
+
+    def run(self, topics_path, out_path, resume=True, progress=sys.stderr):
+        topics = read_topics(topics_path)
+        completed = load_completed_topics(out_path, retry=topics) if resume else set()
+        pending = [topic for topic in topics if topic not in completed]
+        print(f"{len(topics)} topics, {len(topics) - len(pending)} already done, {len(pending)} to run", file=progress)
+        done = failed = 0
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            with open(out_path, "a" if resume else "w", encoding="utf-8") as out:
+                futures = [pool.submit(self.research_topic, topic) for topic in pending]
+                for future in as_completed(futures):
+                    record = future.result()
+                    if record is None:
+                        continue
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    done += 1
+                    if "error" in record:
+                        failed += 1
+                        print(f"[{done}/{len(pending)}] {record['topic']}: {record['error']}", file=progress)
+                    else:
+                        print(f"[{done}/{len(pending)}] {record['topic']} ({record['elapsed_s']}s)", file=progress)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if self.quota_exhausted.is_set():
+            print(f"Stopped early: API quota exhausted ({self.scheduler.stats()['spent']} units spent today). "
+                  "Re-run after the daily reset to resume.", file=progress)
+        return {"total": len(topics), "ran": done, "failed": failed, "quota_exhausted": self.quota_exhausted.is_set()}
@@ -0,0 +1,757 @@
+import os
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_quota import QUOTA_COSTS, QuotaExceededError, QuotaScheduler
+from youtube_trace import TRACER
+
+API_KEY = os.environ.get('YOUTUBE_API_KEY', 'YOUR_API_GOES_HERE')
+# A comma-separated pool of keys to rotate across; falls back to the single API_KEY.
+API_KEYS = [key.strip() for key in os.environ.get('YOUTUBE_API_KEYS', '').split(',') if key.strip()] or [API_KEY]
+DAILY_QUOTA = int(os.environ.get('YOUTUBE_DAILY_QUOTA', '10000'))
+API_REQUESTS_PER_SECOND = float(os.environ.get('YOUTUBE_API_RPS', '5'))
+QUOTA_RESERVE = int(os.environ.get('YOUTUBE_QUOTA_RESERVE', '500'))
+CACHE_DIR = os.environ.get('YOUTUBE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'youtube_research'))
+THUMBNAIL_CACHE_MB = int(os.environ.get('YOUTUBE_THUMBNAIL_CACHE_MB', '100'))
+SEARCH_CACHE_TTL = int(os.environ.get('YOUTUBE_SEARCH_CACHE_TTL', str(6 * 3600)))
+STATS_CACHE_TTL = int(os.environ.get('YOUTUBE_STATS_CACHE_TTL', str(3600)))
+CACHE_STALE_TTL = int(os.environ.get('YOUTUBE_CACHE_STALE_TTL', str(24 * 3600)))
+# Subscriber counts move slowly; a long TTL makes enrichment almost free for recurring channels.
+CHANNEL_CACHE_TTL = int(os.environ.get('YOUTUBE_CHANNEL_CACHE_TTL', str(7 * 24 * 3600)))
+PREFETCH_TTL = int(os.environ.get('YOUTUBE_PREFETCH_TTL', '300'))
+PREFETCH_QUOTA_BUDGET = int(os.environ.get('YOUTUBE_PREFETCH_BUDGET', '1000'))
+MAX_IDS_PER_REQUEST = 50
+# Overriding the discovery URL (e.g. to point at a local stand-in API) skips the bundled copy.
+DISCOVERY_URL = os.environ.get('YOUTUBE_DISCOVERY_URL', "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest")
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+
+def load_discovery_document():
+    """Returns the YouTube v3 discovery document, read once per process from the local cache.
+
+    On a cold cache it is taken from the copy bundled with google-api-python-client, or
+    downloaded once for older client versions, and written to CACHE_DIR under a name
+    derived from DISCOVERY_URL.
+    """
+    global _discovery_document
+    with _discovery_lock:
+        if _discovery_document is None:
+            # Keyed by URL so a document pointing at a stand-in API is never reused for the real one.
+            url_hash = hashlib.sha256(DISCOVERY_URL.encode("utf-8")).hexdigest()[:12]
+            path = os.path.join(CACHE_DIR, f"youtube.v3.discovery.{url_hash}.json")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    _discovery_document = f.read()
+            except OSError:
+                _discovery_document = _fetch_discovery_document()
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                        f.write(_discovery_document)
+                    os.replace(f"{path}.tmp", path)
+                except OSError:
+                    pass
+        return _discovery_document
+
+
+def _fetch_discovery_document():
+    document = None
+    if 'YOUTUBE_DISCOVERY_URL' not in os.environ:
+        try:
+            from googleapiclient.discovery_cache import get_static_doc
+            document = get_static_doc("youtube", "v3")
+        except ImportError:
+            pass
+    if document is None:
+        import requests
+        response = requests.get(DISCOVERY_URL, timeout=10)
+        response.raise_for_status()
+        document = response.text
+    return document
+
+
+def build_youtube_service(api_key=API_KEY):
+    import googleapiclient.discovery
+    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+    return googleapiclient.discovery.build_from_document(load_discovery_document(), developerKey=api_key)
+
+
+def warm_up():
+    """Does the slow, one-off parts of the first API call ahead of time (imports, discovery document)."""
+    import googleapiclient.discovery
+    import googleapiclient.errors
+    load_discovery_document()
+
+
+def open_scheduler():
+    return QuotaScheduler(
+        API_KEYS, build_youtube_service,
+        daily_quota=DAILY_QUOTA,
+        rate=API_REQUESTS_PER_SECOND,
+        burst=max(1, int(API_REQUESTS_PER_SECOND * 2)),
+        reserve_units=QUOTA_RESERVE,
+        state_path=os.path.join(CACHE_DIR, "quota.sqlite3")
+    )
+
+
+def open_thumbnail_cache():
+    return ThumbnailCache(os.path.join(CACHE_DIR, "thumbnails"), THUMBNAIL_CACHE_MB * 1024 * 1024)
+
+
+def open_response_cache():
+    return ResponseCache(
+        os.path.join(CACHE_DIR, "responses.sqlite3"),
+        {"search": SEARCH_CACHE_TTL, "videos": STATS_CACHE_TTL}
+    )
+
+
+def open_research_store():
+    from youtube_store import ResearchStore
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return ResearchStore(os.path.join(CACHE_DIR, "research.sqlite3"))
+
+
+# --- Content-addressed on-disk thumbnail cache with LRU eviction ---
+class ThumbnailCache:
+    """Stores thumbnail bytes under the SHA-256 of their URL.
+
+    Each URL can have several variants ("raw" for the downloaded JPEG, "120x68" for the
+    pre-scaled tile). File mtimes double as the LRU clock so recency survives restarts.
+    `get` only reads; callers count each image load once with `record_fetch`.
+    """
+
+    def __init__(self, directory, max_bytes, tmp_max_age=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        now = time.time()
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+                if name.endswith(".tmp"):
+                    # A recent one may be another process's write in progress; old ones were left by a crash.
+                    if now - stat.st_mtime > tmp_max_age:
+                        os.remove(path)
+                    continue
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _key(url, variant):
+        return f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.{variant}"
+
+    def get(self, url, variant="raw"):
+        key = self._key(url, variant)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+        return data
+
+    def record_fetch(self, url, hit):
+        """Counts one image load; a hit saved downloading the raw image, whose cached size is added to bytes_saved."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += self._entries.get(self._key(url, "raw"), 0)
+            else:
+                self.misses += 1
+
+    def put(self, url, data, variant="raw"):
+        if len(data) > self.max_bytes:
+            return
+        key = self._key(url, variant)
+        path = os.path.join(self.directory, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            evicted = []
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old_key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+            }
+
+
+# --- SQLite-backed TTL cache for API responses (stale-while-revalidate) ---
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class ResponseCache:
+    """Caches raw API responses keyed by endpoint and normalized parameters.
+
+    Each endpoint ("search", "videos") has its own TTL. Entries past their TTL but within
+    `stale_ttl` are still served while a background thread refreshes them. Channel subscriber
+    counts are kept per channel for `channel_ttl`, so every search shares them.
+    """
+
+    def __init__(self, path, ttls, stale_ttl=CACHE_STALE_TTL, channel_ttl=CHANNEL_CACHE_TTL):
+        self.path = path
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self.channel_ttl = channel_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared with other processes (GUI, batch, watch run): WAL lets readers proceed during a
+        # write, and the timeout rides out another process's write instead of failing at once.
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, fetched_at REAL NOT NULL, body TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS channels ("
+                "channel_id TEXT PRIMARY KEY, fetched_at REAL NOT NULL, subscribers INTEGER)"
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?",
+                (time.time() - max(ttls.values()) - stale_ttl,)
+            )
+            self._conn.execute("DELETE FROM channels WHERE fetched_at < ?", (time.time() - channel_ttl,))
+
+    @staticmethod
+    def make_key(endpoint, params):
+        return endpoint + ":" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        return row[0], json.loads(row[1])
+
+    def _store(self, key, endpoint, body, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, fetched_at, body) VALUES (?, ?, ?, ?)",
+                (key, endpoint, fetched_at, json.dumps(body))
+            )
+        return fetched_at
+
+    def _refresh(self, key, endpoint, refresh):
+        try:
+            self._store(key, endpoint, refresh())
+        except Exception as e:
+            print(f"Background refresh of {endpoint} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def fetch(self, endpoint, params, fetch, refresh=None, with_time=False):
+        """Returns the cached response for `params`, calling `fetch()` only when needed.
+
+        `refresh` is used instead of `fetch` for background revalidation; it must be safe to
+        call from another thread. With `with_time`, returns (response, time it was fetched).
+        """
+        with TRACER.span(f"cache.{endpoint}") as span:
+            body, fetched_at = self._fetch(endpoint, params, fetch, refresh, span)
+            return (body, fetched_at) if with_time else body
+
+    def _fetch(self, endpoint, params, fetch, refresh, span):
+        key = self.make_key(endpoint, params)
+        fetched_at, body = self._lookup(key)
+        age = time.time() - fetched_at if body is not None else None
+        ttl = self.ttls[endpoint]
+        if body is not None and age <= ttl:
+            span.set(cache="hit")
+            with self._lock:
+                self.hits += 1
+            return body, fetched_at
+        if body is not None and age <= ttl + self.stale_ttl:
+            span.set(cache="stale")
+            with self._lock:
+                self.stale_hits += 1
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                threading.Thread(target=self._refresh, args=(key, endpoint, refresh or fetch), daemon=True).start()
+            return body, fetched_at
+        span.set(cache="miss")
+        with self._lock:
+            self.misses += 1
+        body = fetch()
+        try:
+            return body, self._store(key, endpoint, body)
+        except sqlite3.Error as e:
+            # The call succeeded and was charged; losing the cache entry must not lose the result.
+            print(f"Could not cache {endpoint} response: {e}")
+            return body, time.time()
+
+    def get_channels(self, channel_ids):
+        """Subscriber counts (None when hidden) of the `channel_ids` cached within `channel_ttl`."""
+        found = {}
+        for start in range(0, len(channel_ids), 500):
+            chunk = channel_ids[start:start + 500]
+            with self._lock:
+                found.update(self._conn.execute(
+                    f"SELECT channel_id, subscribers FROM channels WHERE fetched_at >= ? "
+                    f"AND channel_id IN ({','.join('?' * len(chunk))})",
+                    (time.time() - self.channel_ttl, *chunk)
+                ).fetchall())
+        return found
+
+    def put_channels(self, subscribers):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO channels (channel_id, fetched_at, subscribers) VALUES (?, ?, ?)",
+                [(channel_id, now, count) for channel_id, count in subscribers.items()]
+            )
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+# --- Short-lived hand-off of speculatively fetched videos to the search that wants them ---
+class PrefetchCache:
+    """Videos fetched ahead of a likely search, held for `ttl` seconds until a search claims them.
+
+    Prefetches are charged their worst-case quota cost up front, so concurrent ones cannot
+    overrun `budget`, and settled to the units they actually spent when they finish. A search for a topic whose prefetch is still running waits for it
+    instead of fetching the same pages again.
+    """
+
+    def __init__(self, ttl=PREFETCH_TTL, budget=PREFETCH_QUOTA_BUDGET, max_entries=16):
+        self.ttl = ttl
+        self.budget = budget
+        self.max_entries = max_entries
+        self.spent = 0
+        self.hits = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(topic, max_results, pages):
+        return normalize_query(topic), max_results, pages
+
+    def begin(self, topic, max_results, pages, cost):
+        """Registers a prefetch; False if it is already cached, running, or over budget."""
+        key = self._key(topic, max_results, pages)
+        with self._lock:
+            entry = self._entries.get(key)
+            if key in self._pending or (entry and time.time() - entry[0] <= self.ttl):
+                return False
+            if self.spent + cost > self.budget:
+                return False
+            self.spent += cost
+            self._pending[key] = threading.Event()
+            return True
+
+    def finish(self, topic, max_results, pages, videos=None, refund=0):
+        """Ends a prefetch; `videos` is None when it failed or was cancelled.
+
+        `refund` is the part of the up-front charge that was not spent (negative if retries cost more).
+        """
+        key = self._key(topic, max_results, pages)
+        with self._lock:
+            self.spent -= refund
+            if videos is not None:
+                self._entries[key] = (time.time(), videos)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            event = self._pending.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def claim(self, topic, max_results, pages, cancel=None):
+        """Takes the prefetched videos for a search, waiting for a running prefetch; None on a miss."""
+        key = self._key(topic, max_results, pages)
+        with self._lock:
+            event = self._pending.get(key)
+        while event is not None and not event.wait(0.05):
+            _check_cancelled(cancel)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "spent": self.spent, "budget": self.budget, "entries": len(self._entries)}
+
+
+def prefetch_cost(max_results, pages):
+    """Upper bound on the quota a search costs: per page, one search plus details and channel lookups."""
+    lookups = -(-min(max_results, MAX_IDS_PER_REQUEST) // MAX_IDS_PER_REQUEST)
+    return pages * (QUOTA_COSTS["search"] + lookups * (QUOTA_COSTS["videos"] + QUOTA_COSTS["channels"]))
+
+
+# --- Fetch-and-analyze core, shared by the GUI worker and the batch CLI ---
+class SearchCancelled(Exception):
+    pass
+
+
+def _check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise SearchCancelled()
+
+
+# Partial responses: only the fields the analysis reads are sent back.
+SEARCH_FIELDS = "nextPageToken,items(id/videoId)"
+VIDEO_FIELDS = ("items(id,snippet(title,description,channelTitle,channelId,publishedAt,tags,thumbnails/high/url),"
+                "statistics/viewCount)")
+CHANNEL_FIELDS = "items(id,statistics(subscriberCount,hiddenSubscriberCount))"
+
+
+class VideoRecord:
+    """One fetched video. `views` is an int, or None when the channel hides its view count;
+    `subscribers` is filled in by channel enrichment and stays None when unknown or hidden.
+    `fetched_at` is when the API returned the statistics, which predates a cached response's use."""
+    __slots__ = ("video_id", "title", "description", "channel_title", "channel_id", "published_at",
+                 "thumbnail_high", "views", "tags", "subscribers", "fetched_at")
+
+    def __init__(self, video_id, title, description="", channel_title="", channel_id=None, published_at=None,
+                 thumbnail_high="", views=None, tags=(), subscribers=None, fetched_at=None):
+        self.video_id = video_id
+        self.title = title
+        self.description = description
+        self.channel_title = channel_title
+        self.channel_id = channel_id
+        self.published_at = published_at
+        self.thumbnail_high = thumbnail_high
+        self.views = views
+        self.tags = tags
+        self.subscribers = subscribers
+        self.fetched_at = fetched_at
+
+    def __repr__(self):
+        return f"VideoRecord({self.video_id!r}, {self.title!r}, views={self.views!r})"
+
+    @property
+    def view_count(self):
+        """Views for display: the int, or "N/A" when hidden."""
+        return "N/A" if self.views is None else self.views
+
+
+def parse_video(item, fetched_at=None):
+    """Parses a videos().list item once into a VideoRecord."""
+    snippet = item["snippet"]
+    views = item.get("statistics", {}).get("viewCount")
+    return VideoRecord(
+        item["id"], snippet["title"], snippet.get("description", ""), snippet.get("channelTitle", ""),
+        snippet.get("channelId"), snippet.get("publishedAt"),
+        snippet.get("thumbnails", {}).get("high", {}).get("url", ""),
+        int(views) if views is not None and views.isdigit() else None, tuple(snippet.get("tags", ())),
+        fetched_at=fetched_at,
+    )
+
+
+def _subscriber_count(item):
+    statistics = item.get("statistics", {})
+    count = statistics.get("subscriberCount")
+    if statistics.get("hiddenSubscriberCount") or count is None or not count.isdigit():
+        return None
+    return int(count)
+
+
+class YouTubeResearcher:
+    """Searches YouTube for a topic and turns the top videos into suggestions.
+
+    Holds no Qt state. Every API call goes through the QuotaScheduler, which hands each
+    thread its own service object, so one researcher can be shared across threads.
+    With a `store`, every completed research is also kept as a snapshot for trend queries.
+    With a `signatures` cache, competitor signatures for draft scoring are built once per topic.
+    With a `prefetched` PrefetchCache, research() first claims videos fetched by prefetch().
+    A `background` researcher's API calls yield to the scheduler's quota reserve.
+    """
+
+    def __init__(self, scheduler, response_cache=None, store=None, signatures=None, prefetched=None,
+                 background=False):
+        self.scheduler = scheduler
+        self.response_cache = response_cache
+        self.store = store
+        self.signatures = signatures
+        self.prefetched = prefetched
+        self.background = background
+        # Quota units charged by this researcher's calls, summed across its worker threads.
+        self.units_spent = 0
+        self._units_lock = threading.Lock()
+
+    def research(self, topic, max_results=20, pages=1, on_partial=None, max_titles=10, cancel=None):
+        """Fetches and analyzes `pages` search pages of `max_results` videos each.
+
+        `on_partial(suggestions, page)` is called with the analysis of everything fetched so
+        far after each page's details arrive, so callers can show results before the last page.
+        `max_titles=None` keeps every unique title instead of the top ten. Setting the
+        `cancel` event stops the search before its next API call with SearchCancelled.
+        """
+        on_page = None
+        if on_partial is not None:
+            on_page = lambda videos, page: on_partial(self.analyze_video_data(videos, max_titles), page)
+        with TRACER.span("search", topic=topic, pages=pages) as span:
+            related_videos = None
+            if self.prefetched is not None:
+                related_videos = self.prefetched.claim(topic, max_results, pages, cancel)
+                span.set(prefetched=related_videos is not None)
+            if related_videos is None:
+                related_videos = self.search_videos(
+                    topic, max_results=max_results, pages=pages, on_page=on_page, cancel=cancel)
+            span.set(videos=len(related_videos))
+        if not related_videos:
+            return {}
+        _check_cancelled(cancel)
+        suggestions = self.analyze_video_data(related_videos, max_titles)
+        if self.signatures is not None:
+            from youtube_similarity import CompetitorSignatures
+            with TRACER.span("signatures", videos=len(related_videos)):
+                self.signatures.put(topic, CompetitorSignatures(related_videos))
+        if self.store is not None:
+            try:
+                with TRACER.span("store.record", videos=len(related_videos)):
+                    self.store.record_search(topic, related_videos, suggestions)
+            except Exception as e:
+                print(f"Could not save research history: {e}")
+        return suggestions
+
+    def prefetch(self, topic, max_results=20, pages=1, cancel=None):
+        """Fetches a topic's videos into `prefetched` ahead of a likely search.
+
+        Nothing is analyzed or recorded until a search claims them. Returns False when the
+        topic is already prefetched or in flight, or the prefetch budget is spent.
+        """
+        cost = prefetch_cost(max_results, pages)
+        if not self.prefetched.begin(topic, max_results, pages, cost):
+            return False
+        videos = None
+        # Response-cache hits and cancelled pages cost nothing, so only the units charged are kept.
+        units_before = self.units_spent
+        try:
+            with TRACER.span("prefetch", topic=topic, pages=pages) as span:
+                videos = self.search_videos(topic, max_results=max_results, pages=pages, cancel=cancel)
+                span.set(videos=len(videos))
+        finally:
+            spent = self.units_spent - units_before
+            self.prefetched.finish(topic, max_results, pages, videos, refund=cost - spent)
+        return True
+
+    def _call(self, endpoint, request_factory, background):
+        units_before = self.scheduler.thread_units()
+        try:
+            return self.scheduler.execute(endpoint, request_factory, background=background)
+        finally:
+            with self._units_lock:
+                self.units_spent += self.scheduler.thread_units() - units_before
+
+    def _execute(self, endpoint, cache_params, request_factory, with_time=False):
+        if self.response_cache is None:
+            body = self._call(endpoint, request_factory, self.background)
+            return (body, time.time()) if with_time else body
+        # Revalidating a stale entry is not user-facing, so it yields to the quota reserve.
+        return self.response_cache.fetch(
+            endpoint, cache_params,
+            lambda: self._call(endpoint, request_factory, self.background),
+            refresh=lambda: self._call(endpoint, request_factory, True),
+            with_time=with_time
+        )
+
+    def _search_page(self, query, max_results, page_token=None):
+        search_params = dict(part="id", type="video", maxResults=max_results, safeSearch="none",
+                             fields=SEARCH_FIELDS)
+        if page_token:
+            search_params["pageToken"] = page_token
+        return self._execute(
+            "search",
+            dict(search_params, q=normalize_query(query)),
+            lambda service: service.search().list(q=f'"{query}"', **search_params)
+        )
+
+    def _fetch_details(self, video_ids, cancel=None):
+        videos_data = []
+        for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+            _check_cancelled(cancel)
+            chunk = video_ids[start:start + MAX_IDS_PER_REQUEST]
+            details_params = dict(part="snippet,statistics", id=",".join(chunk), fields=VIDEO_FIELDS)
+            details_response, fetched_at = self._execute(
+                "videos",
+                dict(details_params, id=",".join(sorted(chunk))),
+                lambda service: service.videos().list(**details_params),
+                with_time=True
+            )
+            videos_data.extend(parse_video(item, fetched_at) for item in details_response.get("items", []))
+        try:
+            self._enrich_channels(videos_data, cancel)
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            # Subscriber counts only feed the extra rankings; the search itself still succeeds.
+            print(f"Channel enrichment failed: {e}")
+        return videos_data
+
+    def _enrich_channels(self, videos, cancel=None):
+        """Sets `subscribers` on each video, fetching only channels the response cache lacks."""
+        channel_ids = list(dict.fromkeys(v.channel_id for v in videos if v.channel_id))
+        if not channel_ids:
+            return
+        with TRACER.span("channels", channels=len(channel_ids)) as span:
+            known = self.response_cache.get_channels(channel_ids) if self.response_cache is not None else {}
+            missing = [channel_id for channel_id in channel_ids if channel_id not in known]
+            span.set(cached=len(channel_ids) - len(missing))
+            fetched = {}
+            for start in range(0, len(missing), MAX_IDS_PER_REQUEST):
+                _check_cancelled(cancel)
+                chunk = missing[start:start + MAX_IDS_PER_REQUEST]
+                response = self._call("channels", lambda service: service.channels().list(
+                    part="statistics", id=",".join(chunk), fields=CHANNEL_FIELDS), self.background)
+                # Channels missing from the response (deleted, terminated) are cached as unknown too.
+                fetched.update(dict.fromkeys(chunk))
+                fetched.update((item["id"], _subscriber_count(item)) for item in response.get("items", []))
+            if fetched and self.response_cache is not None:
+                self.response_cache.put_channels(fetched)
+            known.update(fetched)
+        for video in videos:
+            video.subscribers = known.get(video.channel_id)
+
+    def search_videos(self, query, max_results=10, pages=1, on_page=None, cancel=None):
+        from googleapiclient.errors import HttpError
+        try:
+            if pages <= 1:
+                _check_cancelled(cancel)
+                search_response = self._search_page(query, max_results)
+                video_ids = [item['id']['videoId'] for item in search_response.get('items', []) if 'videoId' in item['id']]
+                if not video_ids:
+                    return []
+                videos_data = self._fetch_details(video_ids, cancel)
+                if on_page:
+                    on_page(videos_data, 1)
+                return videos_data
+            return self._search_deep(query, min(max_results, MAX_IDS_PER_REQUEST), pages, on_page, cancel)
+        except (QuotaExceededError, SearchCancelled):
+            raise
+        except HttpError as e:
+            error_message = f"YouTube API Error: {e.resp.status} - {e.content.decode()}"
+            raise Exception(error_message)
+        except Exception as e:
+            raise Exception(f"An unexpected error occurred during Youtube: {str(e)}")
+
+    def _search_deep(self, query, page_size, pages, on_page, cancel=None):
+        # Details for page N are fetched on a helper thread while the search for page N+1 runs here.
+        videos_data = []
+        seen_ids = set()
+        pending = None
+        page_token = None
+        page = 0
+        with ThreadPoolExecutor(max_workers=1) as detail_pool:
+            while page < pages:
+                _check_cancelled(cancel)
+                search_response = self._search_page(query, page_size, page_token)
+                page += 1
+                video_ids = []
+                for item in search_response.get('items', []):
+                    video_id = item['id'].get('videoId')
+                    if video_id and video_id not in seen_ids:
+                        seen_ids.add(video_id)
+                        video_ids.append(video_id)
+                if pending is not None:
+                    videos_data.extend(pending.result())
+                    if on_page:
+                        on_page(list(videos_data), page - 1)
+                pending = detail_pool.submit(self._fetch_details, video_ids, cancel) if video_ids else None
+                page_token = search_response.get("nextPageToken")
+                if not page_token:
+                    break
+            if pending is not None:
+                videos_data.extend(pending.result())
+                if on_page:
+                    on_page(list(videos_data), page)
+        return videos_data
+
+    def compare(self, topics, max_results=20, pages=1, cancel=None, max_workers=10):
+        """Searches several topics concurrently and summarizes them side by side.
+
+        All topics share this researcher's scheduler, so the wall time is close to the slowest
+        topic as long as the rate limit allows. A failed topic is reported under "errors"
+        rather than failing the comparison; running out of quota still raises.
+        """
+        topics = list(dict.fromkeys(topic.strip() for topic in topics if topic.strip()))
+        started = time.perf_counter()
+        videos_by_topic = {}
+        errors = {}
+        with TRACER.span("compare", topics=len(topics)):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(topics)))) as pool:
+                futures = {topic: pool.submit(self.search_videos, topic, max_results, pages, None, cancel)
+                           for topic in topics}
+                for topic, future in futures.items():
+                    try:
+                        videos_by_topic[topic] = future.result()
+                    except (QuotaExceededError, SearchCancelled):
+                        raise
+                    except Exception as e:
+                        errors[topic] = str(e)
+            from youtube_analytics import compare_topics
+            comparison = compare_topics(videos_by_topic)
+        if self.store is not None:
+            for summary in comparison["topics"]:
+                try:
+                    self.store.record_search(summary["topic"], videos_by_topic[summary["topic"]],
+                                             {"keyword_suggestions": summary["top_tags"]})
+                except Exception as e:
+                    print(f"Could not save research history: {e}")
+        comparison["errors"] = errors
+        comparison["elapsed_s"] = round(time.perf_counter() - started, 3)
+        return comparison
+
+    def analyze_video_data(self, videos, max_titles=10):
+        # NumPy is only needed once results arrive, so it stays off the startup path.
+        from youtube_analytics import analyze_videos
+        with TRACER.span("analyze", videos=len(videos)):
+            return analyze_videos(videos, max_titles)
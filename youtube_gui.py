@@ -0,0 +1,1405 @@
+import os
+import sys
+import threading
+import time
+import webbrowser
+import traceback
+
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+    QTextEdit, QPushButton, QMessageBox, QScrollArea, QFrame,
+    QStackedWidget, QGraphicsDropShadowEffect, QLayout, QSpinBox, QListView, QStyledItemDelegate,
+    QStyle, QToolButton, QTreeWidget, QTreeWidgetItem, QCheckBox, QFileDialog, QTableWidget, QTableWidgetItem,
+    QHeaderView, QComboBox
+)
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, pyqtSlot, QObject, QTimer, QRunnable, QThreadPool, QRect, QSize,
+    QBuffer, QByteArray, QIODevice, QAbstractListModel, QModelIndex
+)
+from PyQt6.QtGui import QFont, QColor, QPixmap, QPixmapCache, QImage, QPainter, QPen, QFontMetrics
+
+from youtube_core import (
+    MAX_IDS_PER_REQUEST, PrefetchCache, SearchCancelled, YouTubeResearcher, normalize_query, open_research_store,
+    open_response_cache, open_scheduler, open_thumbnail_cache, warm_up
+)
+from youtube_quota import QuotaExceededError
+from youtube_trace import TRACER
+
+THUMBNAIL_SIZE = (120, 68)
+THUMBNAIL_GALLERY_LIMIT = 50
+# Decoded tiles kept across searches; a 120x68 tile is about 32 KB at 1x.
+PIXMAP_CACHE_MB = int(os.environ.get('YOUTUBE_PIXMAP_CACHE_MB', '32'))
+STARTUP_TIMING = bool(os.environ.get('YOUTUBE_STARTUP_TIMING'))
+MAX_COMPARE_TOPICS = 10
+# Speculative search while typing is opt-in: it spends quota on topics that may never be searched.
+PREFETCH_ENABLED = bool(os.environ.get('YOUTUBE_PREFETCH'))
+PREFETCH_DELAY_MS = int(os.environ.get('YOUTUBE_PREFETCH_DELAY_MS', '700'))
+PREFETCH_MIN_CHARS = 3
+# Title orderings offered on the results page: (label, suggestions key, format of the extra score).
+TITLE_RANKINGS = [
+    ("Views", "title_suggestions", None),
+    ("Views per subscriber", "titles_by_views_per_subscriber", "{:,.2f} views/subscriber"),
+    ("Views per day", "titles_by_views_per_day", "{:,.0f} views/day"),
+]
+
+
+# --- Custom FlowLayout Class ---
+class FlowLayout(QLayout):
+    """Wrapping layout for chips and thumbnails.
+
+    Item size hints, the minimum size and heightForWidth results are cached until an item
+    is added or removed or Qt invalidates the layout (e.g. a child's size hint changed),
+    and items whose rectangle did not change are not repositioned.
+    """
+
+    def __init__(self, parent=None, margin=0, spacing=-1):
+        super().__init__(parent)
+        if parent is not None:
+            self.setContentsMargins(margin, margin, margin, margin)
+        self.setSpacing(spacing)
+        self.itemList = []
+        self._hints = None
+        self._minimum_size = None
+        self._height_for_width = {}
+        self._geometries = {}
+
+    def __del__(self):
+        item = self.takeAt(0)
+        while item:
+            item = self.takeAt(0)
+
+    def _clear_caches(self):
+        self._hints = None
+        self._minimum_size = None
+        self._height_for_width = {}
+        self._geometries = {}
+
+    def invalidate(self):
+        self._clear_caches()
+        super().invalidate()
+
+    def addItem(self, item):
+        self.itemList.append(item)
+        self._clear_caches()
+
+    def count(self):
+        return len(self.itemList)
+
+    def itemAt(self, index):
+        if index >= 0 and index < len(self.itemList):
+            return self.itemList[index]
+        return None
+
+    def takeAt(self, index):
+        if index >= 0 and index < len(self.itemList):
+            self._clear_caches()
+            return self.itemList.pop(index)
+        return None
+
+    def expandingDirections(self):
+        return Qt.Orientation(0)
+
+    def hasHeightForWidth(self):
+        return True
+
+    def heightForWidth(self, width):
+        height = self._height_for_width.get(width)
+        if height is None:
+            height = self._doLayout(QRect(0, 0, width, 0), True)
+            self._height_for_width[width] = height
+        return height
+
+    def setGeometry(self, rect):
+        super().setGeometry(rect)
+        self._doLayout(rect, False)
+
+    def sizeHint(self):
+        return self.minimumSize()
+
+    def minimumSize(self):
+        if self._minimum_size is None:
+            size = QSize()
+            for item in self.itemList:
+                size = size.expandedTo(item.minimumSize())
+            size += QSize(2 * self.contentsMargins().left(), 2 * self.contentsMargins().top())
+            self._minimum_size = size
+        return QSize(self._minimum_size)
+
+    def _item_hints(self):
+        if self._hints is None:
+            self._hints = []
+            for item in self.itemList:
+                hint = item.sizeHint()
+                self._hints.append((hint.width(), hint.height()))
+        return self._hints
+
+    def _doLayout(self, rect, testOnly):
+        x = rect.x()
+        y = rect.y()
+        right = rect.right()
+        lineHeight = 0
+        spaceX = self.spacing()
+        spaceY = self.spacing()
+        geometries = self._geometries
+
+        for item, (width, height) in zip(self.itemList, self._item_hints()):
+            nextX = x + width + spaceX
+            if nextX - spaceX > right and lineHeight > 0:
+                x = rect.x()
+                y = y + lineHeight + spaceY
+                nextX = x + width + spaceX
+                lineHeight = 0
+
+            if not testOnly:
+                geometry = (x, y, width, height)
+                if geometries.get(id(item)) != geometry:
+                    geometries[id(item)] = geometry
+                    item.setGeometry(QRect(x, y, width, height))
+
+            x = nextX
+            lineHeight = max(lineHeight, height)
+
+        return y + lineHeight - rect.y()
+
+
+# --- Worker Class for API Calls (for main data, not thumbnails) ---
+class SearchWorkerBase(QObject):
+    """One background job; `run()` may be called on any thread and ends with exactly one of
+    finished, error or cancelled. Subclasses implement `_work()`, returning the result dict."""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, researcher, max_results=20, parent=None):
+        super().__init__(parent)
+        self.researcher = researcher
+        self.max_results = max_results
+        self.cancel = threading.Event()
+        self.generation = 0
+
+    def run(self):
+        try:
+            if not self.researcher.scheduler:
+                self.error.emit("YouTube API service not initialized. Check your API key.")
+                return
+            self.finished.emit(self._work())
+        except SearchCancelled:
+            self.cancelled.emit()
+        except QuotaExceededError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {str(e)}\n\nTraceback:\n{traceback.format_exc()}"
+            self.error.emit(error_message)
+
+    def _work(self):
+        raise NotImplementedError
+
+
+class YouTubeWorker(SearchWorkerBase):
+    """One search; multi-page searches also emit `partial` as each page's details arrive."""
+    partial = pyqtSignal(dict, int)
+
+    def __init__(self, researcher, topic, max_results=20, pages=1, max_titles=10, parent=None):
+        super().__init__(researcher, max_results, parent)
+        self.topic = topic
+        self.pages = pages
+        self.max_titles = max_titles
+
+    def _work(self):
+        on_partial = self.partial.emit if self.pages > 1 else None
+        return self.researcher.research(
+            self.topic, max_results=self.max_results, pages=self.pages, on_partial=on_partial,
+            max_titles=self.max_titles, cancel=self.cancel)
+
+
+class ComparisonWorker(SearchWorkerBase):
+    """Compares several topics."""
+
+    def __init__(self, researcher, topics, max_results=20, parent=None):
+        super().__init__(researcher, max_results, parent)
+        self.topics = topics
+
+    def _work(self):
+        return self.researcher.compare(self.topics, max_results=self.max_results, cancel=self.cancel)
+
+
+class SearchExecutor(QObject):
+    """Runs searches on a long-lived thread pool.
+
+    Each submit() starts a new generation and cancels in-flight searches for other topics.
+    A repeat of a search that is still running joins it instead of fetching again, and
+    only results for the latest generation are emitted. At most one speculative prefetch
+    runs at a time; it emits nothing and is cancelled once its topic is abandoned.
+    """
+    finished = pyqtSignal(int, dict)
+    partial = pyqtSignal(int, dict, int)
+    compared = pyqtSignal(int, dict)
+    error = pyqtSignal(int, str)
+    _prefetch_done = pyqtSignal(object)
+
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        # Only touched on the GUI thread: workers report back through queued signals.
+        self._flights = {}
+        self._prefetch = None
+        self._prefetch_done.connect(self._on_prefetch_done)
+
+    def submit(self, researcher, topic, max_results=20, pages=1, max_titles=10):
+        key = (normalize_query(topic), max_results, pages, max_titles)
+        # A prefetch of this same search is joined through the researcher's PrefetchCache.
+        self.cancel_prefetch(keep=key[:3])
+        return self._start(key, lambda: YouTubeWorker(
+            researcher, topic, max_results=max_results, pages=pages, max_titles=max_titles))
+
+    def submit_comparison(self, researcher, topics, max_results=20):
+        key = ("compare", tuple(normalize_query(topic) for topic in topics), max_results)
+        self.cancel_prefetch()
+        return self._start(key, lambda: ComparisonWorker(researcher, topics, max_results=max_results))
+
+    def prefetch(self, researcher, topic, max_results=20, pages=1):
+        """Starts `researcher.prefetch()` for a topic, cancelling a prefetch for any other."""
+        key = (normalize_query(topic), max_results, pages)
+        self.cancel_prefetch(keep=key)
+        if self._prefetch is not None:
+            return
+        cancel = threading.Event()
+        self._prefetch = (key, cancel)
+        self.pool.start(lambda: self._run_prefetch(researcher, topic, max_results, pages, cancel))
+
+    def cancel_prefetch(self, keep=None):
+        if self._prefetch is not None and self._prefetch[0] != keep:
+            self._prefetch[1].set()
+            self._prefetch = None
+
+    def _run_prefetch(self, researcher, topic, max_results, pages, cancel):
+        try:
+            researcher.prefetch(topic, max_results=max_results, pages=pages, cancel=cancel)
+        except SearchCancelled:
+            pass
+        except Exception as e:
+            print(f"Prefetch of {topic!r} failed: {e}")
+        finally:
+            self._prefetch_done.emit(cancel)
+
+    @pyqtSlot(object)
+    def _on_prefetch_done(self, cancel):
+        # Finished or failed: later clicks read the PrefetchCache, and a new prefetch may start.
+        if self._prefetch is not None and self._prefetch[1] is cancel:
+            self._prefetch = None
+
+    def _start(self, key, make_worker):
+        self.generation += 1
+        for other_key, worker in self._flights.items():
+            if other_key != key:
+                worker.cancel.set()
+        worker = self._flights.get(key)
+        if worker is None or worker.cancel.is_set():
+            worker = make_worker()
+            if isinstance(worker, YouTubeWorker):
+                worker.partial.connect(self._on_partial)
+            worker.finished.connect(self._on_finished)
+            worker.error.connect(self._on_error)
+            worker.cancelled.connect(self._on_cancelled)
+            self._flights[key] = worker
+            self.pool.start(worker.run)
+        worker.generation = self.generation
+        return self.generation
+
+    def cancel_all(self):
+        self.generation += 1
+        self.cancel_prefetch()
+        for worker in self._flights.values():
+            worker.cancel.set()
+
+    def _finish(self, worker):
+        for key, flight in list(self._flights.items()):
+            if flight is worker:
+                del self._flights[key]
+        return worker.generation == self.generation
+
+    @pyqtSlot(dict, int)
+    def _on_partial(self, suggestions, page):
+        worker = self.sender()
+        if worker.generation == self.generation and not worker.cancel.is_set():
+            self.partial.emit(worker.generation, suggestions, page)
+
+    @pyqtSlot(dict)
+    def _on_finished(self, suggestions):
+        worker = self.sender()
+        if self._finish(worker):
+            signal = self.compared if isinstance(worker, ComparisonWorker) else self.finished
+            signal.emit(worker.generation, suggestions)
+
+    @pyqtSlot(str)
+    def _on_error(self, message):
+        worker = self.sender()
+        if self._finish(worker):
+            self.error.emit(worker.generation, message)
+
+    @pyqtSlot()
+    def _on_cancelled(self):
+        self._finish(self.sender())
+
+    def shutdown(self):
+        self.cancel_all()
+        self.pool.waitForDone(2000)
+
+
+def format_view_count(view_count):
+    if isinstance(view_count, str) and view_count.isdigit():
+        return f"{int(view_count):,}"
+    elif isinstance(view_count, int):
+        return f"{view_count:,}"
+    else:
+        return str(view_count)
+
+class CardFrame(QFrame):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("cardFrame")
+        self.setStyleSheet("""
+            QFrame#cardFrame {
+                background: rgba(40,40,40,0.9);
+                border-radius: 16px;
+                border: 1px solid #333;
+            }
+        """)
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(18)
+        shadow.setColor(QColor(0,0,0,80))
+        shadow.setOffset(0, 6)
+        self.setGraphicsEffect(shadow)
+
+class ClickableLabel(QLabel):
+    def __init__(self, text="", callback=None, parent=None):
+        super().__init__(text, parent)
+        self.callback = callback
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+    def mousePressEvent(self, event):
+        if self.callback:
+            self.callback()
+        super().mousePressEvent(event)
+
+
+# --- Virtualized title list: one model reused across searches, cards painted by a delegate ---
+class TitleListModel(QAbstractListModel):
+    TitleRole = Qt.ItemDataRole.UserRole + 1
+    DetailRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        title, detail = self._rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole, self.TitleRole):
+            return title
+        if role == self.DetailRole:
+            return detail
+        return None
+
+    def set_titles(self, title_suggestions, score_format=None):
+        self.beginResetModel()
+        self._rows = [
+            (title, f"👁️ Views: {format_view_count(views)} by {channel}"
+                    + (f" · {score_format.format(score[0])}" if score_format and score else ""))
+            for title, views, channel, *score in title_suggestions
+        ]
+        self.endResetModel()
+
+
+class CardDelegate(QStyledItemDelegate):
+    """Paints each title as a CardFrame look-alike; only rows in the viewport are ever painted."""
+    CARD_HEIGHT = 92
+    MARGIN = 6
+    RADIUS = 16
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        card = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        # A translucent offset rect stands in for QGraphicsDropShadowEffect's blurred shadow.
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 80))
+        painter.drawRoundedRect(card.translated(0, 3), self.RADIUS, self.RADIUS)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setBrush(QColor(52, 52, 52, 235) if hovered else QColor(40, 40, 40, 230))
+        painter.setPen(QPen(QColor("#43cea2") if hovered else QColor("#333"), 1))
+        painter.drawRoundedRect(card, self.RADIUS, self.RADIUS)
+
+        content = card.adjusted(14, 10, -14, -10)
+        metrics = QFontMetrics(option.font)
+        line_height = metrics.lineSpacing()
+        title_rect = QRect(content.left(), content.top(), content.width(), line_height * 2)
+        # Elide to roughly two lines' worth so long titles never spill into the detail row.
+        title = metrics.elidedText(index.data(TitleListModel.TitleRole), Qt.TextElideMode.ElideRight,
+                                   content.width() * 2 - metrics.averageCharWidth() * 4)
+        painter.setPen(QColor("#FFFFFF"))
+        painter.setFont(option.font)
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap, title)
+        detail_rect = QRect(content.left(), content.bottom() - line_height, content.width(), line_height)
+        painter.setPen(QColor("#E0E0E0"))
+        painter.drawText(detail_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         metrics.elidedText(index.data(TitleListModel.DetailRole), Qt.TextElideMode.ElideRight, content.width()))
+        painter.restore()
+
+
+# --- Thumbnail loading on a bounded worker pool sharing one keep-alive session ---
+class ThumbnailTask(QRunnable):
+    """Loads one tile: `size` is the tile in device pixels, so the decoded image is shown unscaled."""
+
+    def __init__(self, loader, url, generation, size=THUMBNAIL_SIZE):
+        super().__init__()
+        self.loader = loader
+        self.url = url
+        self.generation = generation
+        self.size = size
+
+    def run(self):
+        # Searches started after this task was queued make its result useless.
+        if self.generation != self.loader.generation:
+            return
+        with TRACER.span("thumbnail") as span:
+            self._load(span)
+
+    def _load(self, span):
+        from youtube_thumbnails import read_scaled, variant_url
+        cache = self.loader.cache
+        url = variant_url(self.url, *self.size)
+        variant = "%dx%d" % self.size
+        downloaded = False
+        try:
+            scaled = cache.get(url, variant) if cache else None
+            span.set(cache="hit" if scaled is not None else "miss")
+            image = QImage.fromData(scaled) if scaled is not None else None
+            if image is None or image.isNull():
+                raw = cache.get(url) if cache else None
+                if raw is None:
+                    downloaded = True
+                    response = self.loader.get_session().get(url, timeout=5)
+                    if response.status_code != 200:
+                        self.loader.failed.emit(self.generation, self.url, "Failed")
+                        return
+                    raw = response.content
+                    span.set(bytes=len(raw))
+                    if cache:
+                        cache.put(url, raw)
+                image = read_scaled(raw, *self.size)
+                if image is None:
+                    self.loader.failed.emit(self.generation, self.url, "Invalid")
+                    return
+                if cache:
+                    cache.put(url, encode_jpeg(image), variant)
+            self.loader.loaded.emit(self.generation, self.url, image)
+        except Exception:
+            self.loader.failed.emit(self.generation, self.url, "Error")
+        finally:
+            if cache:
+                cache.record_fetch(url, hit=not downloaded)
+
+
+def encode_jpeg(image, quality=90):
+    """JPEG bytes of a QImage (safe off the GUI thread)."""
+    buffer_bytes = QByteArray()
+    buffer = QBuffer(buffer_bytes)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPEG", quality)
+    return bytes(buffer_bytes)
+
+
+class ThumbnailAnalysisTask(QRunnable):
+    def __init__(self, loader, urls, generation):
+        super().__init__()
+        self.loader = loader
+        self.urls = urls
+        self.generation = generation
+
+    def run(self):
+        if self.generation != self.loader.generation:
+            return
+        try:
+            from youtube_thumbnails import analyze_thumbnails
+            result = analyze_thumbnails(self.urls, self.loader.fetch, self.loader.cache, max_workers=4)
+        except Exception as e:
+            print(f"Thumbnail analysis failed: {e}")
+            return
+        self.loader.analyzed.emit(self.generation, result)
+
+
+class ThumbnailLoader(QObject):
+    """Decodes tiles on a worker pool and hands back QImages; pixmaps are made on the GUI thread."""
+    loaded = pyqtSignal(int, str, QImage)
+    failed = pyqtSignal(int, str, str)
+    analyzed = pyqtSignal(int, dict)
+
+    def __init__(self, max_workers=8, cache=None, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.cache = cache
+        self.max_workers = max_workers
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def get_session(self):
+        # Created on first use so importing requests stays off the startup path.
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+            return self._session
+
+    def new_generation(self):
+        """Invalidates every queued or in-flight download and returns the new generation."""
+        self.generation += 1
+        self.pool.clear()
+        return self.generation
+
+    def load(self, url, generation, size=THUMBNAIL_SIZE):
+        self.pool.start(ThumbnailTask(self, url, generation, size))
+
+    def fetch(self, url):
+        """Image bytes, or None if the download fails; one bad URL only costs its own tile."""
+        try:
+            response = self.get_session().get(url, timeout=5)
+        except Exception as e:
+            print(f"Thumbnail download failed for {url}: {e}")
+            return None
+        return response.content if response.status_code == 200 else None
+
+    def analyze(self, urls, generation):
+        """Perceptual features and near-duplicate groups for `urls`, reported through `analyzed`."""
+        # Queued behind the visible tiles so the gallery fills in first.
+        self.pool.start(ThumbnailAnalysisTask(self, list(urls), generation), -1)
+
+    def shutdown(self):
+        self.new_generation()
+        self.pool.waitForDone(2000)
+        if self._session is not None:
+            self._session.close()
+
+
+class ResponsiveLayout(QWidget):
+    def __init__(self, parent=None, thumbnail_loader=None):
+        super().__init__(parent)
+        self.flowLayout = FlowLayout(self, margin=0, spacing=8)
+        self.thumbnail_loader = thumbnail_loader
+        self._thumb_labels = {}
+        self._generation = None
+        self.tile_size = THUMBNAIL_SIZE
+        self._tile_dpr = 1.0
+        if thumbnail_loader is not None:
+            thumbnail_loader.loaded.connect(self._on_thumbnail_loaded)
+            thumbnail_loader.failed.connect(self._on_thumbnail_failed)
+
+    def _clear_layout(self):
+        self._thumb_labels = {}
+        while self.flowLayout.count():
+            item = self.flowLayout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.deleteLater()
+
+    def _labels_for(self, generation, url):
+        if generation != self._generation or generation != self.thumbnail_loader.generation:
+            return []
+        return self._thumb_labels.pop(url, [])
+
+    def _pixmap_key(self, url):
+        return "thumb:%dx%d:%s" % (*self.tile_size, url)
+
+    @pyqtSlot(int, str, QImage)
+    def _on_thumbnail_loaded(self, generation, url, image):
+        labels = self._labels_for(generation, url)
+        if not labels:
+            return
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self._tile_dpr)
+        QPixmapCache.insert(self._pixmap_key(url), pixmap)
+        for label in labels:
+            label.setPixmap(pixmap)
+
+    @pyqtSlot(int, str, str)
+    def _on_thumbnail_failed(self, generation, url, reason):
+        for label in self._labels_for(generation, url):
+            label.setText(reason)
+
+    def addItems(self, items_data, item_type="keyword"):
+        self._clear_layout()
+        if not items_data:
+            return
+
+        if item_type == "keyword":
+            for keyword in items_data:
+                lbl = QLabel(keyword)
+                lbl.setStyleSheet("""
+                    background: rgba(67,206,162,0.18);
+                    color: #43cea2;
+                    border-radius: 7px;
+                    padding: 8px 12px;
+                    margin: 2px;
+                """)
+                self.flowLayout.addWidget(lbl)
+
+        elif item_type == "swatch":
+            for color, share in items_data:
+                red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+                text_color = "#000" if 0.299 * red + 0.587 * green + 0.114 * blue > 140 else "#fff"
+                lbl = QLabel(f"{color}  {share:.0%}")
+                lbl.setStyleSheet(f"background: {color}; color: {text_color}; border-radius: 7px; "
+                                  "padding: 8px 12px; margin: 2px;")
+                self.flowLayout.addWidget(lbl)
+
+        elif item_type == "thumbnail":
+            self._generation = self.thumbnail_loader.generation
+            # Tiles are decoded at their device-pixel size and shown 1:1, never rescaled by the label.
+            self._tile_dpr = self.devicePixelRatioF()
+            self.tile_size = tuple(round(side * self._tile_dpr) for side in THUMBNAIL_SIZE)
+            for url in items_data:
+                thumb_label = ClickableLabel(callback=lambda u=url: webbrowser.open(u))
+                # The 1px border sits outside the image.
+                thumb_label.setFixedSize(THUMBNAIL_SIZE[0] + 2, THUMBNAIL_SIZE[1] + 2)
+                thumb_label.setStyleSheet("border: 1px solid #555; border-radius: 4px; background-color: #333;")
+                thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.flowLayout.addWidget(thumb_label)
+                pixmap = QPixmapCache.find(self._pixmap_key(url))
+                if pixmap is not None:
+                    thumb_label.setPixmap(pixmap)
+                    continue
+                thumb_label.setText("...")
+                self._thumb_labels.setdefault(url, []).append(thumb_label)
+            # Tiles fill in as each download completes; the GUI thread never blocks on the network.
+            for url in self._thumb_labels:
+                self.thumbnail_loader.load(url, self._generation, self.tile_size)
+
+# --- Startup work that would otherwise delay the first frame ---
+class StartupWorker(QObject):
+    finished = pyqtSignal(object, object, object, object)
+    error = pyqtSignal(str)
+
+    def run(self):
+        try:
+            warm_up()
+            import requests  # Used by the thumbnail session; importing it here keeps the GUI thread free.
+            scheduler = open_scheduler()
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        self.finished.emit(
+            scheduler,
+            self._open_optional("Response cache", open_response_cache),
+            self._open_optional("Thumbnail cache", open_thumbnail_cache),
+            self._open_optional("Research history", open_research_store)
+        )
+
+    @staticmethod
+    def _open_optional(name, opener):
+        try:
+            return opener()
+        except Exception as e:
+            print(f"{name} disabled: {e}")
+            return None
+
+
+class YouTubeOptimizerApp(QWidget):
+    def __init__(self, started_at=None):
+        super().__init__()
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.startup_timings = {}
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_MB * 1024)
+        self.api_scheduler = None
+        self.response_cache = None
+        self.thumbnail_cache = None
+        self.research_store = None
+        self.signature_cache = None
+        self.current_topic = None
+        self.current_suggestions = None
+        self.search_started_at = None
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.thumbnail_loader.analyzed.connect(self.display_thumbnail_analysis)
+        self.thumb_gallery = None
+        self.search_executor = SearchExecutor(parent=self)
+        self.search_executor.partial.connect(lambda generation, suggestions, page:
+                                             self.display_partial_results(suggestions, page))
+        self.search_executor.finished.connect(lambda generation, suggestions: self.display_results(suggestions))
+        self.search_executor.compared.connect(lambda generation, comparison: self.display_comparison(comparison))
+        self.search_executor.error.connect(lambda generation, message: self.display_error(message))
+        # Re-scores the draft shortly after typing stops; scoring uses cached signatures only.
+        self.draft_score_timer = QTimer(self)
+        self.draft_score_timer.setSingleShot(True)
+        self.draft_score_timer.setInterval(200)
+        self.draft_score_timer.timeout.connect(self._update_draft_score)
+        self.prefetch_cache = PrefetchCache()
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self._start_prefetch)
+        self.init_ui()
+        self._start_background_init()
+
+    def _mark_startup(self, name):
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        self.startup_timings[name] = elapsed_ms
+        if STARTUP_TIMING:
+            print(f"startup: {name} {elapsed_ms:.0f} ms", file=sys.stderr, flush=True)
+
+    def _start_background_init(self):
+        self.search_button.setEnabled(False)
+        self.compare_button.setEnabled(False)
+        self.status_label.setText("⏳ Connecting to the YouTube API...")
+        # Owned by the window rather than deleted on finish, so closeEvent can always wait for it.
+        self.startup_thread = QThread(self)
+        self.startup_worker = StartupWorker()
+        self.startup_worker.moveToThread(self.startup_thread)
+        self.startup_worker.finished.connect(self._on_startup_ready)
+        self.startup_worker.error.connect(self._on_startup_error)
+        self.startup_thread.started.connect(self.startup_worker.run)
+        self.startup_worker.finished.connect(self.startup_thread.quit)
+        self.startup_worker.error.connect(self.startup_thread.quit)
+        self.startup_thread.finished.connect(self.startup_worker.deleteLater)
+        self.startup_thread.start()
+
+    def _on_startup_ready(self, scheduler, response_cache, thumbnail_cache, research_store):
+        self.api_scheduler = scheduler
+        self.response_cache = response_cache
+        self.thumbnail_cache = thumbnail_cache
+        self.research_store = research_store
+        self.thumbnail_loader.cache = thumbnail_cache
+        self.search_button.setEnabled(True)
+        self.compare_button.setEnabled(True)
+        self.status_label.setText("Enter video topic and click 'Get Suggestions'.")
+        self._mark_startup("api_ready")
+
+    def _on_startup_error(self, message):
+        self.search_button.setEnabled(True)
+        self.compare_button.setEnabled(True)
+        self.status_label.setText("❌ YouTube API unavailable.")
+        QMessageBox.critical(self, "API Initialization Error",
+            f"Error initializing YouTube API service: {message}\n"
+            "Please ensure you have a valid API key and internet connection.")
+
+    def init_ui(self):
+        self.setWindowTitle("YouTube Video Optimizer")
+        self.setGeometry(100, 100, 1100, 760)
+        self.setStyleSheet("""
+            QWidget {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #232526, stop:1 #414345);
+                color: #E0E0E0;
+                font-family: 'Arial', sans-serif;
+                font-size: 15px;
+            }
+            QLabel {
+                color: #FFFFFF;
+            }
+            QLineEdit, QTextEdit, QSpinBox {
+                background: #232526;
+                color: #F0F0F0;
+                border: 2px solid #43cea2;
+                border-radius: 8px;
+                padding: 10px 12px;
+                font-size: 16px;
+            }
+            QPushButton {
+                background: none;
+            }
+            QFrame#cardFrame {
+                background: rgba(40,40,40,0.9);
+                border-radius: 16px;
+                border: 1px solid #333;
+            }
+            QScrollArea {
+                border: none;
+                background: transparent;
+            }
+        """)
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(0,0,0,0)
+        main_layout.setSpacing(0)
+
+        nav_bar = QHBoxLayout()
+        nav_bar.setSpacing(0)
+        nav_bar.setContentsMargins(0, 24, 0, 24)
+        nav_bar.addStretch(1)
+        self.drafting_btn = QPushButton("Ideas")
+        self.drafting_btn.setCheckable(True)
+        self.drafting_btn.setChecked(True)
+        self.drafting_btn.setFixedHeight(48)
+        self.drafting_btn.setMinimumWidth(180)
+        self.drafting_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #43cea2, stop:1 #185a9d);
+                color: #fff;
+                border-radius: 14px;
+                padding: 12px 36px;
+                font-size: 18px;
+                font-weight: bold;
+                border: none;
+                margin-right: 28px;
+                margin-left: 0px;
+            }
+            QPushButton:checked, QPushButton:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #185a9d, stop:1 #43cea2);
+                color: #fff;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #38bfa2, stop:1 #144a7d);
+                color: #fff;
+            }
+        """)
+        self.drafting_btn.clicked.connect(lambda: self.switch_panel(0))
+        nav_bar.addWidget(self.drafting_btn, alignment=Qt.AlignmentFlag.AlignVCenter)
+        nav_bar.addSpacing(28)
+        self.results_btn = QPushButton("Search Results")
+        self.results_btn.setCheckable(True)
+        self.results_btn.setChecked(False)
+        self.results_btn.setFixedHeight(48)
+        self.results_btn.setMinimumWidth(180)
+        self.results_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #43cea2, stop:1 #185a9d);
+                color: #fff;
+                border-radius: 14px;
+                padding: 12px 36px;
+                font-size: 18px;
+                font-weight: bold;
+                border: none;
+                margin-left: 0px;
+                margin-right: 0px;
+            }
+            QPushButton:checked, QPushButton:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #185a9d, stop:1 #43cea2);
+                color: #fff;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #38bfa2, stop:1 #144a7d);
+                color: #fff;
+            }
+        """)
+        self.results_btn.clicked.connect(lambda: self.switch_panel(1))
+        nav_bar.addWidget(self.results_btn, alignment=Qt.AlignmentFlag.AlignVCenter)
+        nav_bar.addStretch(1)
+        main_layout.addLayout(nav_bar)
+
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self._drafting_panel())
+        self.stack.addWidget(self._results_panel())
+        main_layout.addWidget(self.stack)
+
+    def switch_panel(self, idx):
+        self.stack.setCurrentIndex(idx)
+        self.drafting_btn.setChecked(idx == 0)
+        self.results_btn.setChecked(idx == 1)
+
+    def _drafting_panel(self):
+        w = QWidget()
+        l = QVBoxLayout(w)
+        l.setContentsMargins(40, 30, 40, 30)
+        l.setSpacing(18)
+        title_label = QLabel("YouTube Video Optimizer")
+        title_label.setFont(QFont("Arial", 26, QFont.Weight.Bold))
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("color: #43cea2; margin: 10px 0 18px 0;")
+        l.addWidget(title_label)
+        l.addWidget(QLabel("Video Topic:"))
+        self.topic_input = QLineEdit()
+        self.topic_input.setPlaceholderText("e.g., 'Oppo Find X8 Ultra'")
+        self.topic_input.textChanged.connect(self._on_search_edited)
+        l.addWidget(self.topic_input)
+        self.prefetch_checkbox = QCheckBox("Start searching while I type (uses API quota)")
+        self.prefetch_checkbox.setChecked(PREFETCH_ENABLED)
+        self.prefetch_checkbox.setToolTip("Fetches results once typing pauses, so the search button shows them "
+                                          "right away. Limited to a fixed quota budget per session.")
+        self.prefetch_checkbox.toggled.connect(self._on_search_edited)
+        l.addWidget(self.prefetch_checkbox)
+        l.addWidget(QLabel("Your Draft Video Title:"))
+        self.title_input = QLineEdit()
+        self.title_input.setPlaceholderText("Your exciting video title here")
+        l.addWidget(self.title_input)
+        l.addWidget(QLabel("Your Initial Keywords (comma-separated):"))
+        self.keywords_input = QLineEdit()
+        self.keywords_input.setPlaceholderText("keyword1, keyword2, keyword3")
+        l.addWidget(self.keywords_input)
+        l.addWidget(QLabel("Your Video Script (optional):"))
+        self.script_input = QTextEdit()
+        self.script_input.setPlaceholderText("Paste your video script here...")
+        self.script_input.setMaximumHeight(120)
+        l.addWidget(self.script_input)
+        self.title_input.textChanged.connect(self.draft_score_timer.start)
+        self.keywords_input.textChanged.connect(self.draft_score_timer.start)
+        self.script_input.textChanged.connect(self.draft_score_timer.start)
+        l.addWidget(QLabel(f"Search Depth (pages; deep searches fetch {MAX_IDS_PER_REQUEST} videos per page):"))
+        self.pages_input = QSpinBox()
+        self.pages_input.setRange(1, 10)
+        self.pages_input.setValue(1)
+        self.pages_input.valueChanged.connect(self._on_search_edited)
+        l.addWidget(self.pages_input)
+        self.search_button = QPushButton("🔍 Get Optimization Suggestions")
+        self.search_button.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #43cea2, stop:1 #185a9d);
+                color: #fff;
+                border-radius: 10px;
+                padding: 14px 28px;
+                font-weight: 600;
+                font-size: 17px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #38bfa2, stop:1 #144a7d);
+            }
+        """)
+        self.search_button.clicked.connect(self.start_optimization)
+        l.addWidget(self.search_button, alignment=Qt.AlignmentFlag.AlignHCenter)
+        l.addWidget(QLabel(f"Compare Topics (one per line, up to {MAX_COMPARE_TOPICS}):"))
+        self.compare_input = QTextEdit()
+        self.compare_input.setPlaceholderText("Pixel 9 Pro\niPhone 16 Pro\nGalaxy S24 Ultra")
+        self.compare_input.setMaximumHeight(90)
+        l.addWidget(self.compare_input)
+        self.compare_button = QPushButton("⚖️ Compare Topics")
+        self.compare_button.clicked.connect(self.start_comparison)
+        l.addWidget(self.compare_button, alignment=Qt.AlignmentFlag.AlignHCenter)
+        self.status_label = QLabel("Enter video topic and click 'Get Suggestions'.")
+        self.status_label.setStyleSheet("font-weight: bold; color: #64B5F6; qproperty-alignment: AlignCenter;")
+        l.addWidget(self.status_label)
+        l.addStretch()
+        return w
+
+    def _results_panel(self):
+        w = QWidget()
+        l = QVBoxLayout(w)
+        l.setContentsMargins(24, 20, 24, 24)
+        l.setSpacing(10)
+        self.draft_score_label = QLabel()
+        self.draft_score_label.setWordWrap(True)
+        self.draft_score_label.setStyleSheet("color: #FFD54F; background: transparent;")
+        self.draft_score_label.hide()
+        l.addWidget(self.draft_score_label)
+        self.titles_header = QWidget()
+        header = QHBoxLayout(self.titles_header)
+        header.setContentsMargins(0, 0, 0, 0)
+        header.addWidget(QLabel("📹 Top Video Titles (Click to copy):"))
+        header.addStretch()
+        header.addWidget(QLabel("Rank by:"))
+        self.title_ranking = QComboBox()
+        self.title_ranking.addItems([label for label, _, _ in TITLE_RANKINGS])
+        self.title_ranking.setToolTip("Per-subscriber and per-day rankings favor titles that overperformed, "
+                                      "not just the biggest channels.")
+        self.title_ranking.currentIndexChanged.connect(self._show_titles)
+        header.addWidget(self.title_ranking)
+        self.titles_header.hide()
+        l.addWidget(self.titles_header)
+        self.titles_model = TitleListModel(self)
+        self.titles_view = QListView()
+        self.titles_view.setModel(self.titles_model)
+        self.titles_view.setItemDelegate(CardDelegate(self.titles_view))
+        self.titles_view.setUniformItemSizes(True)
+        self.titles_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.titles_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.titles_view.setMouseTracking(True)
+        self.titles_view.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self.titles_view.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.titles_view.clicked.connect(lambda index: self.copy_to_clipboard(index.data(TitleListModel.TitleRole)))
+        self.titles_view.hide()
+        l.addWidget(self.titles_view, 3)
+        self.output_area = QScrollArea()
+        self.output_area.setWidgetResizable(True)
+        self.output_content = QWidget()
+        self.output_layout = QVBoxLayout(self.output_content)
+        self.output_area.setWidget(self.output_content)
+        l.addWidget(self.output_area, 2)
+        l.addWidget(self._diagnostics_section())
+        return w
+
+    def _diagnostics_section(self):
+        w = QWidget()
+        l = QVBoxLayout(w)
+        l.setContentsMargins(0, 0, 0, 0)
+        self.diagnostics_toggle = QToolButton()
+        self.diagnostics_toggle.setText("Diagnostics")
+        self.diagnostics_toggle.setCheckable(True)
+        self.diagnostics_toggle.setArrowType(Qt.ArrowType.RightArrow)
+        self.diagnostics_toggle.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.diagnostics_toggle.setStyleSheet("QToolButton { border: none; color: #9E9E9E; background: transparent; }")
+        self.diagnostics_toggle.toggled.connect(self._toggle_diagnostics)
+        l.addWidget(self.diagnostics_toggle)
+        self.diagnostics_body = QWidget()
+        body = QVBoxLayout(self.diagnostics_body)
+        body.setContentsMargins(0, 0, 0, 0)
+        controls = QHBoxLayout()
+        self.trace_checkbox = QCheckBox("Record stage timings")
+        self.trace_checkbox.setChecked(TRACER.enabled)
+        self.trace_checkbox.toggled.connect(lambda checked: setattr(TRACER, "enabled", checked))
+        controls.addWidget(self.trace_checkbox)
+        controls.addStretch()
+        export_button = QPushButton("Export Trace…")
+        export_button.clicked.connect(self.export_trace)
+        controls.addWidget(export_button)
+        body.addLayout(controls)
+        self.diagnostics_tree = QTreeWidget()
+        self.diagnostics_tree.setHeaderLabels(["Stage", "Start (ms)", "Duration (ms)", "Bytes", "Quota", "Cache"])
+        self.diagnostics_tree.setRootIsDecorated(False)
+        self.diagnostics_tree.setMinimumHeight(160)
+        body.addWidget(self.diagnostics_tree)
+        self.diagnostics_body.hide()
+        l.addWidget(self.diagnostics_body)
+        return w
+
+    def _toggle_diagnostics(self, expanded):
+        self.diagnostics_toggle.setArrowType(Qt.ArrowType.DownArrow if expanded else Qt.ArrowType.RightArrow)
+        self.diagnostics_body.setVisible(expanded)
+        if expanded:
+            self._refresh_diagnostics()
+
+    def _refresh_diagnostics(self):
+        # Only built while the section is open, so a collapsed panel costs nothing per search.
+        if not self.diagnostics_toggle.isChecked():
+            return
+        self.diagnostics_tree.clear()
+        if not TRACER.enabled and not TRACER.spans():
+            self.diagnostics_tree.addTopLevelItem(
+                QTreeWidgetItem(["Enable 'Record stage timings' and run a search", "", "", "", "", ""]))
+            return
+        spans = TRACER.spans(self.search_started_at)
+        origin = spans[0]["start_ms"] if spans else 0.0
+        self.diagnostics_tree.addTopLevelItems([QTreeWidgetItem([
+            span["name"] + (f" ({span['error']})" if "error" in span else ""),
+            f"{span['start_ms'] - origin:.1f}",
+            f"{span['duration_ms']:.1f}",
+            f"{span['bytes']:,}" if "bytes" in span else "",
+            str(span.get("quota_units", "")),
+            span.get("cache", ""),
+        ]) for span in spans])
+        for column in range(self.diagnostics_tree.columnCount()):
+            self.diagnostics_tree.resizeColumnToContents(column)
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "youtube_trace.json", "Chrome trace (*.json);;JSON Lines spans (*.jsonl)")
+        if not path:
+            return
+        try:
+            TRACER.export(path, self.search_started_at)
+            self.status_label.setText(f"📊 Trace saved to {os.path.basename(path)}")
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def _search_params(self):
+        pages = self.pages_input.value()
+        return (20 if pages == 1 else MAX_IDS_PER_REQUEST), pages
+
+    def _on_search_edited(self):
+        # A running prefetch for text the user has since changed is abandoned.
+        max_results, pages = self._search_params()
+        self.search_executor.cancel_prefetch(keep=(normalize_query(self.topic_input.text()), max_results, pages))
+        if self.prefetch_checkbox.isChecked():
+            self.prefetch_timer.start()
+        else:
+            self.prefetch_timer.stop()
+
+    def _start_prefetch(self):
+        topic = self.topic_input.text().strip()
+        if len(topic) < PREFETCH_MIN_CHARS or not self.api_scheduler or not self.prefetch_checkbox.isChecked():
+            return
+        max_results, pages = self._search_params()
+        if not self.api_scheduler.can_afford("search", pages, background=True):
+            return
+        self.search_executor.prefetch(
+            YouTubeResearcher(self.api_scheduler, self.response_cache, prefetched=self.prefetch_cache, background=True),
+            topic, max_results=max_results, pages=pages)
+
+    def start_optimization(self):
+        topic = self.topic_input.text().strip()
+        if not topic:
+            QMessageBox.warning(self, "Missing Topic", "Please enter a video topic.")
+            return
+        self.prefetch_timer.stop()
+        # The button stays enabled: a new search supersedes (and cancels) the running one.
+        self.status_label.setText("🔄 Analyzing... Please wait.")
+
+        self.thumbnail_loader.new_generation()
+        self._clear_output_layout()
+        self.titles_model.set_titles([])
+        self.draft_score_label.hide()
+        if self.signature_cache is None:
+            from youtube_similarity import SignatureCache
+            self.signature_cache = SignatureCache()
+        self.current_topic = topic
+        self.search_started_at = TRACER.now()
+
+        max_results, pages = self._search_params()
+        # The virtualized list handles any number of titles, so deep searches keep them all.
+        self.search_executor.submit(
+            YouTubeResearcher(self.api_scheduler, self.response_cache, self.research_store, self.signature_cache,
+                              self.prefetch_cache),
+            topic, max_results=max_results, pages=pages, max_titles=10 if pages == 1 else None)
+
+    def start_comparison(self):
+        topics = list(dict.fromkeys(line.strip() for line in self.compare_input.toPlainText().splitlines() if line.strip()))
+        if len(topics) < 2:
+            QMessageBox.warning(self, "Not Enough Topics", "Enter at least two topics to compare, one per line.")
+            return
+        if len(topics) > MAX_COMPARE_TOPICS:
+            QMessageBox.warning(self, "Too Many Topics", f"Compare at most {MAX_COMPARE_TOPICS} topics at a time.")
+            return
+        self.status_label.setText(f"🔄 Comparing {len(topics)} topics... Please wait.")
+        self.thumbnail_loader.new_generation()
+        self._clear_output_layout()
+        self.titles_model.set_titles([])
+        self.draft_score_label.hide()
+        self.current_topic = None
+        self.search_started_at = TRACER.now()
+        self.search_executor.submit_comparison(
+            YouTubeResearcher(self.api_scheduler, self.response_cache, self.research_store), topics)
+
+    def display_comparison(self, comparison):
+        self.status_label.setText("✅ Comparison ready!")
+        with TRACER.span("render.compare", topics=len(comparison["topics"])):
+            self._render_comparison(comparison)
+        self._refresh_diagnostics()
+
+    def _render_comparison(self, comparison):
+        self._clear_output_layout()
+        self.titles_model.set_titles([])
+        self.titles_header.hide()
+        self.titles_view.hide()
+        summaries = comparison["topics"]
+        self.output_layout.addWidget(QLabel(
+            f"⚖️ {len(summaries)} Topics Compared in {comparison['elapsed_s']:.1f}s:"))
+        summary_table = self._comparison_table(
+            ["Topic", "Videos", "Median Views", "Channels", "Top Tags"],
+            [[s["topic"], str(s["videos"]), format_view_count(int(s["median_views"])), str(s["channels"]),
+              ", ".join(s["top_tags"][:6])] for s in summaries])
+        self.output_layout.addWidget(summary_table)
+
+        if len(summaries) > 1:
+            self.output_layout.addWidget(QLabel("🏷️ Tag Overlap Between Topics:"))
+            names = [s["topic"] for s in summaries]
+            overlap = self._comparison_table(
+                names, [[f"{value:.0%}" for value in row] for row in comparison["tag_overlap"]])
+            overlap.setVerticalHeaderLabels(names)
+            overlap.verticalHeader().show()
+            self.output_layout.addWidget(overlap)
+            shared = [f"{pair['topics'][0]} + {pair['topics'][1]}: {', '.join(pair['shared_tags'])}"
+                      for pair in comparison["tag_pairs"] if pair["shared_tags"]]
+            if shared:
+                self._add_chip_section("🔗 Most Shared Tags:", shared[:10])
+
+        if comparison["shared_channels"]:
+            self._add_chip_section("📺 Channels Ranking for Several Topics:", [
+                f"{shared['channel']} ({len(shared['topics'])})" for shared in comparison["shared_channels"][:30]])
+        for topic, error in comparison["errors"].items():
+            self.output_layout.addWidget(QLabel(f"❌ {topic}: {error}"))
+        self.output_layout.addStretch()
+        self.output_content.adjustSize()
+        self.switch_panel(1)
+
+    @staticmethod
+    def _comparison_table(headers, rows):
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().hide()
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                table.setItem(r, c, QTableWidgetItem(value))
+        table.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        table.setFixedHeight(table.horizontalHeader().sizeHint().height()
+                             + table.verticalHeader().defaultSectionSize() * len(rows) + 2 * table.frameWidth())
+        return table
+
+    def _clear_output_layout(self):
+        self.thumb_gallery = None
+        if self.output_layout is None:
+            return
+        while self.output_layout.count():
+            child = self.output_layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+
+    def display_partial_results(self, suggestions, page):
+        self.status_label.setText(f"🔄 Page {page} of up to {self.pages_input.value()} analyzed... Fetching more.")
+        if suggestions and suggestions.get("title_suggestions"):
+            # Thumbnails wait for the final result so their downloads are not restarted every page.
+            with TRACER.span("render.partial", page=page, titles=len(suggestions["title_suggestions"])):
+                self._render_results(suggestions, show_thumbnails=False)
+
+    def display_results(self, suggestions):
+        self.status_label.setText("✅ Suggestions ready!")
+        self.search_button.setEnabled(True)
+        if self.api_scheduler:
+            self.status_label.setToolTip(f"API quota left today: {self.api_scheduler.remaining():,} units")
+        with TRACER.span("render", titles=len((suggestions or {}).get("title_suggestions", []))):
+            self._render_results(suggestions)
+        self._update_draft_score()
+        self._refresh_diagnostics()
+
+    def _update_draft_score(self):
+        signatures = self.signature_cache.get(self.current_topic) if self.signature_cache and self.current_topic else None
+        if signatures is None:
+            return
+        from youtube_similarity import parse_keywords, score_draft
+        score = score_draft(
+            signatures, self.title_input.text(), self.keywords_input.text(), self.script_input.toPlainText())
+        lines = []
+        if "title_similarity" in score:
+            line = f"Title: {score['title_similarity']:.0%} similar to the closest competitor"
+            if score["closest_titles"]:
+                line += f" (\"{score['closest_titles'][0][0]}\")"
+            lines.append(line)
+        if "keyword_overlap" in score:
+            line = (f"Keywords: {len(score['keywords_used_by_competitors'])} of "
+                    f"{len(parse_keywords(self.keywords_input.text()))} used by competitors, "
+                    f"{len(score['keywords_in_top_tags'])} in the top tags")
+            if score["missing_top_tags"]:
+                line += f"; consider: {', '.join(score['missing_top_tags'][:5])}"
+            lines.append(line)
+        if "script_similarity" in score:
+            lines.append(f"Script: {score['script_similarity']:.0%} similar to the closest competitor description")
+        self.draft_score_label.setText("🎯 Your Draft vs. Competitors\n" + "\n".join(lines))
+        self.draft_score_label.setVisible(bool(lines))
+
+    def _render_results(self, suggestions, show_thumbnails=True):
+        self._clear_output_layout()
+
+        has_titles = bool(suggestions and suggestions.get("title_suggestions"))
+        self.current_suggestions = suggestions if has_titles else None
+        self._show_titles()
+        self.titles_header.setVisible(has_titles)
+        self.titles_view.setVisible(has_titles)
+        if not has_titles:
+            self.output_layout.addWidget(QLabel("❌ No suggestions found for this topic."))
+            self.switch_panel(1)
+            return
+
+        if suggestions["keyword_suggestions"]:
+            self.output_layout.addWidget(QLabel("🏷️ Suggested Keywords:"))
+            kw_card = CardFrame()
+            kw_card_layout = QVBoxLayout(kw_card)
+            kw_responsive = ResponsiveLayout()
+            kw_responsive.addItems(suggestions["keyword_suggestions"], "keyword") 
+            kw_card_layout.addWidget(kw_responsive)
+            self.output_layout.addWidget(kw_card)
+
+        weighted_keywords = [tag for tag, score in suggestions.get("weighted_keywords", [])]
+        if weighted_keywords:
+            self._add_chip_section("📈 Keywords Weighted by Views:", weighted_keywords)
+
+        phrases = suggestions.get("top_trigrams", []) + suggestions.get("top_bigrams", [])
+        if phrases:
+            self._add_chip_section("💬 Common Title Phrases:", [f"{phrase} ×{count}" for phrase, count in phrases])
+
+        if show_thumbnails and suggestions["thumbnail_urls"]:
+            thumb_header = QLabel("🖼️ Sample Thumbnails (Click to open):")
+            if self.thumbnail_cache:
+                stats = self.thumbnail_cache.stats()
+                thumb_header.setToolTip(
+                    f"Thumbnail cache: {stats['hits']} hits, {stats['misses']} misses, "
+                    f"{stats['bytes_saved'] / 1024:.0f} KB saved")
+            self.output_layout.addWidget(thumb_header)
+            thumb_card = CardFrame()
+            thumb_card_layout = QVBoxLayout(thumb_card)
+            thumb_responsive = ResponsiveLayout(thumbnail_loader=self.thumbnail_loader)
+            thumb_responsive.addItems(suggestions["thumbnail_urls"][:THUMBNAIL_GALLERY_LIMIT], "thumbnail")
+            thumb_card_layout.addWidget(thumb_responsive)
+            self.output_layout.addWidget(thumb_card)
+            self.thumb_header = thumb_header
+            self.thumb_card = thumb_card
+            self.thumb_gallery = thumb_responsive
+            self.thumb_gallery_urls = suggestions["thumbnail_urls"][:THUMBNAIL_GALLERY_LIMIT]
+            # Analysis reads the same variant the tiles downloaded, so each image is fetched once.
+            from youtube_thumbnails import variant_url
+            self.thumb_variant_urls = {
+                variant_url(url, *thumb_responsive.tile_size): url for url in suggestions["thumbnail_urls"]}
+            self.thumbnail_loader.analyze(list(self.thumb_variant_urls), self.thumbnail_loader.generation)
+        
+        self.output_content.adjustSize()
+        self.switch_panel(1)
+
+    def display_thumbnail_analysis(self, generation, analysis):
+        if generation != self.thumbnail_loader.generation or self.thumb_gallery is None:
+            return
+        unique = [self.thumb_variant_urls.get(url, url) for url in analysis["unique_urls"][:THUMBNAIL_GALLERY_LIMIT]]
+        if unique != self.thumb_gallery_urls:
+            self.thumb_gallery.addItems(unique, "thumbnail")
+        # One analysis per rendered gallery.
+        self.thumb_gallery = None
+        hidden = sum(len(duplicates) for duplicates in analysis["duplicates"].values())
+        if hidden:
+            self.thumb_header.setText(f"🖼️ Sample Thumbnails ({hidden} near-duplicates hidden, click to open):")
+        if analysis["palette"]:
+            position = self.output_layout.indexOf(self.thumb_card) + 1
+            heading = QLabel(f"🎨 Thumbnail Colors (average brightness {analysis['brightness']:.0%}, "
+                             f"contrast {analysis['contrast']:.0%}):")
+            card = CardFrame()
+            card_layout = QVBoxLayout(card)
+            swatches = ResponsiveLayout()
+            swatches.addItems(analysis["palette"], "swatch")
+            card_layout.addWidget(swatches)
+            self.output_layout.insertWidget(position, heading)
+            self.output_layout.insertWidget(position + 1, card)
+        self.output_content.adjustSize()
+
+    def _show_titles(self):
+        _, key, score_format = TITLE_RANKINGS[self.title_ranking.currentIndex()]
+        self.titles_model.set_titles((self.current_suggestions or {}).get(key, []), score_format)
+
+    def _add_chip_section(self, heading, chips):
+        self.output_layout.addWidget(QLabel(heading))
+        card = CardFrame()
+        card_layout = QVBoxLayout(card)
+        responsive = ResponsiveLayout()
+        responsive.addItems(chips, "keyword")
+        card_layout.addWidget(responsive)
+        self.output_layout.addWidget(card)
+
+    def copy_to_clipboard(self, text):
+        try:
+            QApplication.clipboard().setText(text)
+            self.status_label.setText("📋 Copied to clipboard!")
+            QTimer.singleShot(3000, lambda: self.status_label.setText("✅ Suggestions ready!"))
+        except Exception as e:
+            print(f"Error copying to clipboard: {e}")
+
+    def display_error(self, message):
+        self.status_label.setText("❌ Error occurred.")
+        self.search_button.setEnabled(True)
+        self._refresh_diagnostics()
+        QMessageBox.critical(self, "Error", message)
+
+    def closeEvent(self, event):
+        self.search_executor.shutdown()
+        self.thumbnail_loader.shutdown()
+        # Closing during startup waits for the API warm-up; destroying a running QThread aborts the process.
+        self.startup_thread.quit()
+        self.startup_thread.wait()
+        event.accept()
+
+
+def main(argv=None, started_at=None):
+    app = QApplication(sys.argv if argv is None else argv)
+    window = YouTubeOptimizerApp(started_at=started_at)
+    window.show()
+    # Runs on the first event loop iteration, i.e. once the window can take input.
+    QTimer.singleShot(0, lambda: window._mark_startup("window_interactive"))
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from youtube_trace import TRACER
+
+# Units charged per call by the YouTube Data API v3.
+QUOTA_COSTS = {"search": 100, "videos": 1, "channels": 1}
+QUOTA_EXHAUSTED_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+RATE_LIMITED_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    _QUOTA_TZ = timezone(timedelta(hours=-8))
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+def quota_day():
+    """Daily quotas reset at midnight Pacific time."""
+    return datetime.now(_QUOTA_TZ).strftime("%Y-%m-%d")
+
+
+def error_reason(http_error):
+    try:
+        errors = json.loads(http_error.content.decode())["error"].get("errors", [])
+        return errors[0].get("reason", "") if errors else ""
+    except (ValueError, KeyError, AttributeError, IndexError):
+        return ""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaScheduler:
+    """Single gateway for YouTube API calls.
+
+    Tracks the units spent on each API key per quota day, picks the key with the most
+    budget left, rate-limits with a token bucket and retries 429/5xx responses with
+    jittered exponential backoff. A key that reports quotaExceeded is parked until the
+    next quota day and the call moves on to the next key.
+
+    `background=True` calls (cache revalidation, prefetching) are refused once the
+    remaining budget drops below `reserve_units`, keeping what is left for user-facing work.
+    """
+
+    def __init__(self, api_keys, service_factory, daily_quota=10000, rate=5.0, burst=10,
+                 max_retries=4, reserve_units=0, state_path=None):
+        if not api_keys:
+            raise ValueError("At least one API key is required.")
+        self.api_keys = list(api_keys)
+        self.service_factory = service_factory
+        self.daily_quota = daily_quota
+        self.max_retries = max_retries
+        self.reserve_units = reserve_units
+        self.state_path = state_path
+        self.bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._day = quota_day()
+        self._spent = {key: 0 for key in self.api_keys}
+        self._exhausted = set()
+        self._db = self._open_state()
+        self._load_state()
+
+    @staticmethod
+    def _key_id(key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+    def _open_state(self):
+        """Opens the SQLite file holding per-key spend, shared by every process using the cache dir.
+
+        Reservations add to the stored counters (`spent = spent + ?`), so the GUI, batch runs
+        and the watchlist daemon never overwrite each other's spend.
+        """
+        if not self.state_path:
+            return None
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.state_path, timeout=30, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS quota (day TEXT NOT NULL, key_id TEXT NOT NULL, "
+                    "spent INTEGER NOT NULL DEFAULT 0, exhausted INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (day, key_id))"
+                )
+                conn.execute("DELETE FROM quota WHERE day < ?", (self._day,))
+            return conn
+        except sqlite3.Error as e:
+            print(f"Quota state unavailable, tracking in memory only: {e}")
+            return None
+
+    def _load_state(self):
+        """Replaces the in-memory counters with today's totals across all processes."""
+        if self._db is None:
+            return
+        try:
+            rows = self._db.execute("SELECT key_id, spent, exhausted FROM quota WHERE day = ?", (self._day,)).fetchall()
+        except sqlite3.Error:
+            return
+        keys = {self._key_id(key): key for key in self.api_keys}
+        for key_id, spent, exhausted in rows:
+            key = keys.get(key_id)
+            if key is None:
+                continue
+            self._spent[key] = spent
+            if exhausted:
+                self._exhausted.add(key)
+
+    def _add_spent(self, key, units, exhausted=False):
+        self._spent[key] = max(0, self._spent[key] + units)
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO quota (day, key_id, spent, exhausted) VALUES (?, ?, MAX(0, ?), ?) "
+                    "ON CONFLICT (day, key_id) DO UPDATE SET spent = MAX(0, spent + ?), "
+                    "exhausted = MAX(exhausted, excluded.exhausted)",
+                    (self._day, self._key_id(key), units, int(exhausted), units)
+                )
+        except sqlite3.Error:
+            pass
+
+    def _roll_day(self):
+        day = quota_day()
+        if day != self._day:
+            self._day = day
+            self._spent = {key: 0 for key in self.api_keys}
+            self._exhausted = set()
+        self._load_state()
+
+    def _key_remaining(self, key):
+        if key in self._exhausted:
+            return 0
+        return max(0, self.daily_quota - self._spent[key])
+
+    def remaining(self):
+        """Total units left today across all keys."""
+        with self._lock:
+            self._roll_day()
+            return sum(self._key_remaining(key) for key in self.api_keys)
+
+    def remaining_by_key(self):
+        with self._lock:
+            self._roll_day()
+            return {self._key_id(key): self._key_remaining(key) for key in self.api_keys}
+
+    def can_afford(self, endpoint, calls=1, background=False):
+        needed = QUOTA_COSTS[endpoint] * calls + (self.reserve_units if background else 0)
+        return self.remaining() >= needed
+
+    def _reserve(self, cost, background):
+        with self._lock:
+            self._roll_day()
+            candidates = [key for key in self.api_keys if self._key_remaining(key) >= cost]
+            total = sum(self._key_remaining(key) for key in self.api_keys)
+            if not candidates or (background and total - cost < self.reserve_units):
+                raise QuotaExceededError(
+                    f"YouTube API quota exhausted: {total} units left today across "
+                    f"{len(self.api_keys)} key(s), {cost} needed. Quota resets at midnight Pacific time.")
+            key = max(candidates, key=self._key_remaining)
+            self._add_spent(key, cost)
+            return key, self._day
+
+    def _release(self, key, cost, day):
+        """Refunds a reservation for an attempt that never reached the API.
+
+        A reservation from before the quota reset is not refunded: that day's budget is gone,
+        and today's count must not drop below what was really spent today.
+        """
+        with self._lock:
+            self._roll_day()
+            if day == self._day:
+                self._add_spent(key, -cost)
+
+    def _mark_exhausted(self, key):
+        with self._lock:
+            self._exhausted.add(key)
+            self._add_spent(key, 0, exhausted=True)
+
+    def _service(self, key):
+        # googleapiclient services are not thread-safe, so each thread gets its own per key.
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = {}
+        if key not in services:
+            services[key] = self.service_factory(key)
+        return services[key]
+
+    def execute(self, endpoint, request_factory, background=False):
+        """Runs `request_factory(service).execute()` under quota, rate limit and retry policy."""
+        with TRACER.span(f"api.{endpoint}", background=background) as span:
+            return self._execute(endpoint, request_factory, background, span)
+
+    def _execute(self, endpoint, request_factory, background, span):
+        from googleapiclient.errors import HttpError
+        cost = QUOTA_COSTS[endpoint]
+        attempt = 0
+        units = 0
+        while True:
+            key, day = self._reserve(cost, background)
+            units += cost
+            self._local.units = self.thread_units() + cost
+            span.set(quota_units=units, attempts=attempt + 1)
+            self.bucket.acquire()
+            try:
+                response = request_factory(self._service(key)).execute()
+                if span.recording:
+                    span.set(bytes=len(json.dumps(response)))
+                return response
+            except HttpError as e:
+                status = e.resp.status
+                reason = error_reason(e)
+                if status == 403 and reason in QUOTA_EXHAUSTED_REASONS:
+                    self._mark_exhausted(key)
+                    continue
+                retryable = status == 429 or status >= 500 or (status == 403 and reason in RATE_LIMITED_REASONS)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+            except OSError:
+                # Connection resets and socket timeouts: no response came back, so the
+                # attempt is not charged, and an outage does not drain the daily budget.
+                self._release(key, cost, day)
+                units -= cost
+                self._local.units -= cost
+                span.set(quota_units=units)
+                if attempt >= self.max_retries:
+                    raise
+            # Full jitter: sleep a random time up to the exponential backoff ceiling.
+            time.sleep(random.uniform(0, min(32.0, 0.5 * 2 ** attempt)))
+            attempt += 1
+
+    def thread_units(self):
+        """Units charged so far by calls on the current thread; diff it around a task to meter it."""
+        return getattr(self._local, "units", 0)
+
+    def stats(self):
+        with self._lock:
+            self._roll_day()
+            return {
+                "day": self._day,
+                "spent": sum(self._spent.values()),
+                "remaining": sum(self._key_remaining(key) for key in self.api_keys),
+                "keys": len(self.api_keys),
+                "exhausted_keys": len(self._exhausted),
+            }
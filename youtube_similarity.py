@@ -0,0 +1,129 @@
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from youtube_analytics import STOPWORDS, tokenize
+from youtube_core import normalize_query
+
+N_FEATURES = 1 << 18
+
+
+def _hash(feature):
+    # crc32 rather than hash() so feature ids stay stable across runs.
+    return zlib.crc32(feature.encode("utf-8")) & (N_FEATURES - 1)
+
+
+def text_features(text, char_ngrams=False):
+    """Words and word pairs (stopwords dropped), plus character trigrams for short texts like titles."""
+    words = [word for word in tokenize(text) if word not in STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if char_ngrams:
+        for word in words:
+            padded = f"^{word}$"
+            features.extend("#" + padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def parse_keywords(text):
+    return list(dict.fromkeys(keyword.strip().lower() for keyword in text.split(",") if keyword.strip()))
+
+
+class HashedCorpus:
+    """TF-IDF vectors in a hashed feature space, stored as flat (doc, feature, weight) arrays.
+
+    Scoring a new text against every document is one gather and one bincount.
+    """
+
+    def __init__(self, texts, char_ngrams=False):
+        self.size = len(texts)
+        self.char_ngrams = char_ngrams
+        hashed = [np.unique(np.fromiter(map(_hash, text_features(text, char_ngrams)), dtype=np.int64), return_counts=True)
+                  for text in texts]
+        lengths = np.fromiter((len(ids) for ids, _ in hashed), dtype=np.int64, count=self.size)
+        self.doc_ids = np.repeat(np.arange(self.size, dtype=np.int64), lengths)
+        self.feature_ids = np.concatenate([ids for ids, _ in hashed]) if self.size else np.empty(0, dtype=np.int64)
+        counts = np.concatenate([c for _, c in hashed]) if self.size else np.empty(0, dtype=np.int64)
+        df = np.bincount(self.feature_ids, minlength=N_FEATURES)
+        self.idf = (np.log((1 + self.size) / (1 + df)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts)) * self.idf[self.feature_ids]
+        norms = np.sqrt(np.bincount(self.doc_ids, weights=weights * weights, minlength=self.size))
+        self.weights = weights / np.maximum(norms, 1e-12)[self.doc_ids]
+
+    def similarities(self, text):
+        """Cosine similarity of `text` to every document."""
+        ids, counts = np.unique(
+            np.fromiter(map(_hash, text_features(text, self.char_ngrams)), dtype=np.int64), return_counts=True)
+        if not len(ids) or not self.size:
+            return np.zeros(self.size)
+        weights = (1 + np.log(counts)) * self.idf[ids]
+        query = np.zeros(N_FEATURES, dtype=np.float64)
+        query[ids] = weights / np.linalg.norm(weights)
+        return np.bincount(self.doc_ids, weights=self.weights * query[self.feature_ids], minlength=self.size)
+
+
+class CompetitorSignatures:
+    """Everything needed to score a draft against one topic's competitors, built once per search."""
+
+    def __init__(self, videos, top_tags=15):
+        self.titles = [v.title for v in videos]
+        self.title_corpus = HashedCorpus(self.titles, char_ngrams=True)
+        self.description_corpus = HashedCorpus([v.description for v in videos])
+        tag_counts = {}
+        for video in videos:
+            for tag in {tag.lower().strip() for tag in video.tags if tag and len(tag.strip()) > 1}:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        self.tag_counts = tag_counts
+        self.top_tags = sorted(tag_counts, key=tag_counts.get, reverse=True)[:top_tags]
+
+
+def score_draft(signatures, title="", keywords="", script="", closest=3):
+    """Compares a draft title, comma-separated keywords and script to the competitors.
+
+    Similarities are cosine scores in [0, 1]; keyword scores are shares of the draft keywords.
+    """
+    result = {}
+    if title.strip():
+        scores = signatures.title_corpus.similarities(title)
+        order = np.argsort(-scores, kind="stable")[:closest]
+        result["title_similarity"] = float(scores.max()) if len(scores) else 0.0
+        result["closest_titles"] = [(signatures.titles[i], float(scores[i])) for i in order if scores[i] > 0]
+    draft_keywords = parse_keywords(keywords)
+    if draft_keywords:
+        used = [keyword for keyword in draft_keywords if keyword in signatures.tag_counts]
+        top = set(signatures.top_tags)
+        result["keyword_overlap"] = len(used) / len(draft_keywords)
+        result["keywords_used_by_competitors"] = used
+        result["keywords_in_top_tags"] = [keyword for keyword in draft_keywords if keyword in top]
+        result["missing_top_tags"] = [tag for tag in signatures.top_tags if tag not in draft_keywords]
+    if script.strip():
+        scores = signatures.description_corpus.similarities(script)
+        result["script_similarity"] = float(scores.max()) if len(scores) else 0.0
+        result["script_similarity_top5"] = float(np.sort(scores)[-5:].mean()) if len(scores) else 0.0
+    return result
+
+
+class SignatureCache:
+    """Keeps the most recent topics' signatures in memory so re-scoring an edited draft needs no API call."""
+
+    def __init__(self, max_topics=32):
+        self.max_topics = max_topics
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, topic, signatures):
+        with self._lock:
+            key = normalize_query(topic)
+            self._entries[key] = signatures
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_topics:
+                self._entries.popitem(last=False)
+
+    def get(self, topic):
+        with self._lock:
+            key = normalize_query(topic)
+            signatures = self._entries.get(key)
+            if signatures is not None:
+                self._entries.move_to_end(key)
+            return signatures
@@ -0,0 +1,419 @@
+import json
+import sqlite3
+import threading
+import time
+
+from youtube_core import normalize_query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    channel_title TEXT,
+    channel_id TEXT,
+    published_at TEXT,
+    thumbnail_url TEXT,
+    tags TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS searches (
+    search_id INTEGER PRIMARY KEY,
+    topic TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    video_count INTEGER NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'search'
+);
+CREATE INDEX IF NOT EXISTS searches_topic_time ON searches (topic, fetched_at);
+CREATE TABLE IF NOT EXISTS snapshots (
+    search_id INTEGER NOT NULL REFERENCES searches (search_id),
+    topic TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    rank INTEGER NOT NULL,
+    view_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_topic_time ON snapshots (topic, fetched_at);
+CREATE INDEX IF NOT EXISTS snapshots_video_time ON snapshots (video_id, fetched_at);
+CREATE TABLE IF NOT EXISTS search_keywords (
+    search_id INTEGER NOT NULL REFERENCES searches (search_id),
+    rank INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (search_id, rank)
+);
+CREATE TABLE IF NOT EXISTS watchlist (
+    topic TEXT PRIMARY KEY,
+    added_at REAL NOT NULL,
+    last_search_at REAL,
+    last_refresh_at REAL,
+    search_failures INTEGER NOT NULL DEFAULT 0,
+    search_retry_at REAL
+);
+CREATE TABLE IF NOT EXISTS watch_videos (
+    topic TEXT NOT NULL REFERENCES watchlist (topic) ON DELETE CASCADE,
+    video_id TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    search_rank INTEGER,
+    views INTEGER,
+    views_at REAL,
+    views_per_day REAL,
+    rank INTEGER,
+    rank_change INTEGER,
+    PRIMARY KEY (topic, video_id)
+);
+"""
+# Refresh rows in `searches` (kind 'refresh') hold stats-only snapshots of a watched topic;
+# their snapshot ranks are positions by views among the topic's tracked videos.
+
+EXPORT_QUERIES = {
+    "snapshots": """
+        SELECT s.topic, s.search_id, s.fetched_at, s.rank, s.video_id, s.view_count,
+               v.title, v.channel_title, v.channel_id, v.published_at
+        FROM snapshots s JOIN videos v ON v.video_id = s.video_id
+        {where} ORDER BY s.topic, s.fetched_at, s.rank
+    """,
+    "videos": """
+        SELECT video_id, title, channel_title, channel_id, published_at, thumbnail_url, tags, first_seen, last_seen
+        FROM videos ORDER BY video_id
+    """,
+    "keywords": """
+        SELECT se.topic, se.fetched_at, k.search_id, k.rank, k.keyword
+        FROM search_keywords k JOIN searches se ON se.search_id = k.search_id
+        {where} ORDER BY se.topic, se.fetched_at, k.rank
+    """,
+}
+# Arrow types of each exported column (pyarrow type factory names), in query order. Declared
+# up front because SQLite columns are untyped: a batch of hidden view counts would infer null.
+EXPORT_SCHEMAS = {
+    "snapshots": [("topic", "string"), ("search_id", "int64"), ("fetched_at", "float64"), ("rank", "int64"),
+                  ("video_id", "string"), ("view_count", "int64"), ("title", "string"), ("channel_title", "string"),
+                  ("channel_id", "string"), ("published_at", "string")],
+    "videos": [("video_id", "string"), ("title", "string"), ("channel_title", "string"), ("channel_id", "string"),
+               ("published_at", "string"), ("thumbnail_url", "string"), ("tags", "string"),
+               ("first_seen", "float64"), ("last_seen", "float64")],
+    "keywords": [("topic", "string"), ("fetched_at", "float64"), ("search_id", "int64"), ("rank", "int64"),
+                 ("keyword", "string")],
+}
+
+
+class ResearchStore:
+    """Local history of every search: video metadata, per-search view snapshots and top keywords.
+
+    Each search is written in a single transaction. Topics are stored normalized so the same
+    topic typed differently shares one history.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def record_search(self, topic, videos, suggestions=None, fetched_at=None):
+        topic = normalize_query(topic)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        videos = [v for v in videos if v.video_id]
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO searches (topic, fetched_at, video_count) VALUES (?, ?, ?)",
+                (topic, fetched_at, len(videos))
+            )
+            search_id = cursor.lastrowid
+            self._conn.executemany(
+                """INSERT INTO videos (video_id, title, channel_title, channel_id, published_at, thumbnail_url,
+                                       tags, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (video_id) DO UPDATE SET
+                       title = excluded.title, channel_title = excluded.channel_title,
+                       thumbnail_url = excluded.thumbnail_url, tags = excluded.tags, last_seen = excluded.last_seen""",
+                [(v.video_id, v.title, v.channel_title, v.channel_id, v.published_at, v.thumbnail_high,
+                  json.dumps(list(v.tags)), fetched_at, fetched_at) for v in videos]
+            )
+            # Counts served from the response cache are stamped with when the API returned them,
+            # so a repeat search adds no fresh-looking copy of old numbers to growth queries.
+            self._conn.executemany(
+                "INSERT INTO snapshots (search_id, topic, video_id, fetched_at, rank, view_count) VALUES (?, ?, ?, ?, ?, ?)",
+                [(search_id, topic, v.video_id, v.fetched_at or fetched_at, rank, v.views)
+                 for rank, v in enumerate(videos, 1)]
+            )
+            keywords = (suggestions or {}).get("keyword_suggestions", [])
+            self._conn.executemany(
+                "INSERT INTO search_keywords (search_id, rank, keyword) VALUES (?, ?, ?)",
+                [(search_id, rank, keyword) for rank, keyword in enumerate(keywords, 1)]
+            )
+        return search_id
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def topics(self):
+        return self._query(
+            "SELECT topic, COUNT(*) AS searches, MIN(fetched_at) AS first_fetched, MAX(fetched_at) AS last_fetched "
+            "FROM searches WHERE kind = 'search' GROUP BY topic ORDER BY last_fetched DESC"
+        )
+
+    def view_growth(self, topic, days=30, limit=50):
+        """Per-video view gain between its first and last snapshot for `topic` in the last `days`."""
+        since = time.time() - days * 86400
+        return self._query("""
+            WITH windowed AS (
+                SELECT video_id, fetched_at, view_count, rank,
+                       ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY fetched_at) AS first_row,
+                       ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY fetched_at DESC) AS last_row
+                FROM snapshots
+                WHERE topic = ? AND fetched_at >= ? AND view_count IS NOT NULL
+            ),
+            first AS (SELECT * FROM windowed WHERE first_row = 1),
+            last AS (SELECT * FROM windowed WHERE last_row = 1)
+            SELECT last.video_id, v.title, v.channel_title,
+                   first.view_count AS first_views, last.view_count AS last_views,
+                   last.view_count - first.view_count AS growth,
+                   (last.view_count - first.view_count) / MAX((last.fetched_at - first.fetched_at) / 86400.0, 1.0 / 24)
+                       AS views_per_day,
+                   first.rank AS first_rank, last.rank AS last_rank,
+                   first.fetched_at AS first_fetched, last.fetched_at AS last_fetched
+            FROM last JOIN first ON first.video_id = last.video_id
+            JOIN videos v ON v.video_id = last.video_id
+            ORDER BY growth DESC
+            LIMIT ?
+        """, (normalize_query(topic), since, limit))
+
+    def topic_history(self, topic, days=30):
+        """One row per search or watchlist refresh: when it ran, how many videos it saw and their total views."""
+        return self._query("""
+            SELECT se.search_id, se.kind, se.fetched_at, se.video_count, SUM(s.view_count) AS total_views
+            FROM searches se LEFT JOIN snapshots s ON s.search_id = se.search_id
+            WHERE se.topic = ? AND se.fetched_at >= ?
+            GROUP BY se.search_id ORDER BY se.fetched_at
+        """, (normalize_query(topic), time.time() - days * 86400))
+
+    def new_top_keywords(self, topic, days=7, top_n=15):
+        """Keywords in the top `top_n` of a search in the last `days` that were not in the top
+        `top_n` of the latest search before that window."""
+        topic = normalize_query(topic)
+        since = time.time() - days * 86400
+        return self._query("""
+            WITH baseline AS (
+                SELECT search_id FROM searches WHERE topic = ? AND kind = 'search' AND fetched_at < ?
+                ORDER BY fetched_at DESC LIMIT 1
+            )
+            SELECT k.keyword, MIN(se.fetched_at) AS first_entered, MIN(k.rank) AS best_rank
+            FROM search_keywords k JOIN searches se ON se.search_id = k.search_id
+            WHERE se.topic = ? AND se.fetched_at >= ? AND k.rank <= ?
+              AND k.keyword NOT IN (
+                  SELECT keyword FROM search_keywords WHERE search_id IN (SELECT search_id FROM baseline) AND rank <= ?
+              )
+            GROUP BY k.keyword ORDER BY best_rank, first_entered
+        """, (topic, since, topic, since, top_n, top_n))
+
+    # --- Watchlist: tracked video IDs per topic, refreshed from stats instead of re-searched ---
+    def watch_add(self, topics, now=None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO watchlist (topic, added_at) VALUES (?, ?)",
+                [(normalize_query(topic), now) for topic in topics]
+            )
+
+    def watch_remove(self, topics):
+        topics = [(normalize_query(topic),) for topic in topics]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM watch_videos WHERE topic = ?", topics)
+            self._conn.executemany("DELETE FROM watchlist WHERE topic = ?", topics)
+
+    def watch_topics(self):
+        return self._query("""
+            SELECT w.topic, w.added_at, w.last_search_at, w.last_refresh_at, w.search_failures, w.search_retry_at,
+                   COUNT(v.video_id) AS videos
+            FROM watchlist w LEFT JOIN watch_videos v ON v.topic = w.topic
+            GROUP BY w.topic ORDER BY w.topic
+        """)
+
+    def watch_due(self, kind, before, now=None):
+        """Watched topics whose last search (or refresh) is older than `before`, most overdue first.
+
+        Searches that failed are not due again until their retry time has passed `now`.
+        """
+        now = time.time() if now is None else now
+        column = {"search": "last_search_at", "refresh": "last_refresh_at"}[kind]
+        # A topic has nothing to refresh until its first search.
+        condition = "last_search_at IS NOT NULL" if kind == "refresh" else "COALESCE(search_retry_at, 0) <= ?"
+        rows = self._query(
+            f"SELECT topic FROM watchlist WHERE {condition} AND ({column} IS NULL OR {column} < ?) "
+            f"ORDER BY {column} IS NOT NULL, {column}",
+            (before,) if kind == "refresh" else (now, before)
+        )
+        return [row["topic"] for row in rows]
+
+    def watch_search_failed(self, topic, retry_base, retry_max, now=None):
+        """Schedules a failed topic search for retry, doubling the delay per consecutive failure.
+
+        Returns the retry time; `last_search_at` is left alone so only a success advances it.
+        """
+        topic = normalize_query(topic)
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT search_failures FROM watchlist WHERE topic = ?", (topic,)).fetchone()
+            failures = (row[0] if row else 0) + 1
+            retry_at = now + min(retry_base * 2 ** min(failures - 1, 30), retry_max)
+            self._conn.execute(
+                "UPDATE watchlist SET search_failures = ?, search_retry_at = ? WHERE topic = ?",
+                (failures, retry_at, topic)
+            )
+        return retry_at
+
+    def watch_video_ids(self, topics):
+        ids = {}
+        for row in self._query(
+                f"SELECT topic, video_id FROM watch_videos WHERE topic IN ({','.join('?' * len(topics))}) "
+                "ORDER BY topic, search_rank", [normalize_query(topic) for topic in topics]):
+            ids.setdefault(row["topic"], []).append(row["video_id"])
+        return ids
+
+    def watch_sync(self, topic, fetched_at=None):
+        """Makes the topic's latest search its tracked video set; returns the IDs that are new."""
+        topic = normalize_query(topic)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT search_id FROM searches WHERE topic = ? AND kind = 'search' ORDER BY fetched_at DESC LIMIT 1",
+                (topic,)
+            ).fetchone()
+            found = self._conn.execute(
+                "SELECT video_id, rank, view_count, fetched_at FROM snapshots WHERE search_id = ? ORDER BY rank",
+                (row[0],)
+            ).fetchall() if row else []
+            previous = {video_id for video_id, in self._conn.execute(
+                "SELECT video_id FROM watch_videos WHERE topic = ?", (topic,))}
+            found_ids = [video_id for video_id, _, _, _ in found]
+            self._conn.executemany(
+                "DELETE FROM watch_videos WHERE topic = ? AND video_id = ?",
+                [(topic, video_id) for video_id in previous.difference(found_ids)]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO watch_videos (topic, video_id, first_seen) VALUES (?, ?, ?)",
+                [(topic, video_id, fetched_at) for video_id in found_ids]
+            )
+            self._conn.executemany(
+                "UPDATE watch_videos SET search_rank = ? WHERE topic = ? AND video_id = ?",
+                [(rank, topic, video_id) for video_id, rank, _, _ in found]
+            )
+            self._conn.execute(
+                "UPDATE watchlist SET last_search_at = ?, search_failures = 0, search_retry_at = NULL WHERE topic = ?",
+                (fetched_at, topic)
+            )
+        # The search's counts may come from the response cache, so each is applied as of when it
+        # was fetched, oldest first; counts older than a video's last refresh are ignored.
+        by_time = {}
+        for video_id, _, views, views_at in found:
+            by_time.setdefault(views_at, {})[video_id] = views
+        for views_at in sorted(by_time):
+            self.watch_refresh({topic: by_time[views_at]}, views_at, record=False)
+        return [video_id for video_id in found_ids if video_id not in previous]
+
+    def watch_refresh(self, views_by_topic, fetched_at=None, record=True):
+        """Applies fresh view counts ({topic: {video_id: views}}) to the tracked videos.
+
+        Velocity and rank change are computed from each video's previous state, so a refresh
+        costs the same however long the history grows. With `record`, the counts are also kept
+        as a refresh snapshot so growth queries see them.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            for topic, views in views_by_topic.items():
+                topic = normalize_query(topic)
+                state = {video_id: (old_views, views_at, rank) for video_id, old_views, views_at, rank in
+                         self._conn.execute("SELECT video_id, views, views_at, rank FROM watch_videos WHERE topic = ?",
+                                            (topic,))}
+                # Videos the API no longer returns (removed, private: passed as None) keep their last
+                # count but lose their velocity. Counts older than the stored ones (from a cached
+                # search) and videos not passed at all are left as they are. Neither gets a snapshot
+                # row: nothing new was observed for them.
+                fresh = {video_id for video_id, (_, views_at, _) in state.items()
+                         if views.get(video_id) is not None and (views_at is None or fetched_at > views_at)}
+                gone = {video_id for video_id in state if video_id in views and views[video_id] is None}
+                current = {video_id: views[video_id] if video_id in fresh else old[0]
+                           for video_id, old in state.items()}
+                ranked = sorted(current, key=lambda video_id: -(current[video_id] or 0))
+                updates = []
+                for rank, video_id in enumerate(ranked, 1):
+                    old_views, views_at, old_rank = state[video_id]
+                    new_views = current[video_id]
+                    velocity = None
+                    if video_id in fresh and old_views is not None and views_at is not None:
+                        velocity = (new_views - old_views) / max((fetched_at - views_at) / 86400, 1 / 24)
+                    fresh_at = fetched_at if video_id in fresh else views_at
+                    updates.append((
+                        new_views, fresh_at, video_id not in gone, velocity, rank,
+                        None if old_rank is None else old_rank - rank, topic, video_id))
+                self._conn.executemany(
+                    "UPDATE watch_videos SET views = ?, views_at = ?, "
+                    "views_per_day = CASE WHEN ? THEN COALESCE(?, views_per_day) END, rank = ?, rank_change = ? "
+                    "WHERE topic = ? AND video_id = ?", updates
+                )
+                self._conn.execute("UPDATE watchlist SET last_refresh_at = ? WHERE topic = ?", (fetched_at, topic))
+                if record and fresh:
+                    search_id = self._conn.execute(
+                        "INSERT INTO searches (topic, fetched_at, video_count, kind) VALUES (?, ?, ?, 'refresh')",
+                        (topic, fetched_at, len(fresh))
+                    ).lastrowid
+                    self._conn.executemany(
+                        "INSERT INTO snapshots (search_id, topic, video_id, fetched_at, rank, view_count) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(search_id, topic, video_id, fetched_at, rank, current[video_id])
+                         for rank, video_id in enumerate(ranked, 1) if video_id in fresh]
+                    )
+
+    def watch_report(self, topic=None, limit=50):
+        """Tracked videos, fastest-growing first, with their rank movement since the last refresh."""
+        where = "WHERE w.topic = ?" if topic else ""
+        return self._query(f"""
+            SELECT w.topic, w.video_id, v.title, v.channel_title, w.views, w.views_per_day,
+                   w.rank, w.rank_change, w.search_rank, w.first_seen, w.views_at
+            FROM watch_videos w LEFT JOIN videos v ON v.video_id = w.video_id
+            {where} ORDER BY w.topic, w.views_per_day IS NULL, w.views_per_day DESC LIMIT ?
+        """, ((normalize_query(topic), limit) if topic else (limit,)))
+
+    def export(self, path, table="snapshots", topic=None, batch_size=50000):
+        """Streams a table to Parquet (.parquet) or Arrow IPC (anything else). Needs pyarrow."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exporting requires pyarrow: pip install pyarrow")
+        sql = EXPORT_QUERIES[table]
+        params = ()
+        if "{where}" in sql:
+            alias = "s" if table == "snapshots" else "se"
+            sql = sql.format(where=f"WHERE {alias}.topic = ?" if topic else "")
+            params = (normalize_query(topic),) if topic else ()
+        schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in EXPORT_SCHEMAS[table]])
+        # A separate connection keeps a long export from holding the lock writers need.
+        conn = sqlite3.connect(self.path)
+        writer = None
+        rows_written = 0
+        try:
+            writer = pq.ParquetWriter(path, schema) if path.endswith(".parquet") else pa.ipc.new_file(path, schema)
+            cursor = conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                batch = pa.RecordBatch.from_pylist([dict(zip(columns, row)) for row in rows], schema=schema)
+                if path.endswith(".parquet"):
+                    writer.write_table(pa.Table.from_batches([batch], schema=schema))
+                else:
+                    writer.write_batch(batch)
+                rows_written += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+            conn.close()
+        return rows_written
@@ -0,0 +1,252 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from youtube_trace import TRACER
+
+# Bump when the feature computation changes so stale cached features are ignored.
+FEATURE_VARIANT = "features-v2"
+HASH_SIZE = 8
+SAMPLE_SIZE = 32
+PALETTE_SIZE = 5
+# 3 bits per channel: 512 color bins per image.
+PALETTE_BITS = 3
+NEAR_DUPLICATE_DISTANCE = 6
+# YouTube's stock sizes that always exist; the 4:3 ones letterbox the 16:9 frame between black bars.
+THUMBNAIL_VARIANTS = (("default", 120, 90), ("mqdefault", 320, 180), ("hqdefault", 480, 360))
+_VARIANT_RE = re.compile(r"/(default|mqdefault|hqdefault|sddefault|maxresdefault)\.(jpg|webp)\b")
+
+
+def frame_rect(width, height):
+    """The 16:9 frame inside a width x height thumbnail as (x, y, w, h), letterbox bars excluded."""
+    frame_height = round(width * 9 / 16)
+    if frame_height < height - 1:
+        return 0, (height - frame_height) // 2, width, frame_height
+    return 0, 0, width, height
+
+
+def variant_url(url, width, height):
+    """The smallest stock variant of a YouTube thumbnail URL whose frame covers width x height pixels.
+
+    Other URLs are returned unchanged.
+    """
+    match = _VARIANT_RE.search(url)
+    if not match:
+        return url
+    for name, variant_width, variant_height in THUMBNAIL_VARIANTS:
+        _, _, frame_width, frame_height = frame_rect(variant_width, variant_height)
+        if frame_width >= width and frame_height >= height:
+            break
+    return url[:match.start(1)] + name + url[match.end(1):]
+
+
+def read_scaled(data, width, height):
+    """Decodes image bytes to a width x height QImage of the thumbnail's frame, or None.
+
+    The reader downscales while decoding (JPEG DCT scaling), so the full-size image is never
+    materialized; letterbox bars are cropped afterwards, one pixel inside to avoid their
+    blurred edge. Safe off the GUI thread and without a QApplication.
+    """
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QSize
+    from PyQt6.QtGui import QImageReader
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    size = reader.size()
+    if not size.isValid():
+        return None
+    x, y, frame_width, frame_height = frame_rect(size.width(), size.height())
+    boxed = frame_height < size.height()
+    scale_x = width / frame_width
+    scale_y = (height + 2 if boxed else height) / frame_height
+    reader.setScaledSize(QSize(round(size.width() * scale_x), round(size.height() * scale_y)))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return image.copy(round(x * scale_x), round(y * scale_y) + 1, width, height) if boxed else image
+
+
+def decode_thumbnail(data, size=SAMPLE_SIZE):
+    """Decodes image bytes straight to a size x size RGB array of the frame, or None if undecodable.
+
+    Uses Pillow when installed, otherwise Qt's image reader (no QApplication needed). Both
+    let the JPEG decoder skip most of the work when downscaling.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return _decode_with_qt(data, size)
+    import io
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (size * 2, size * 2))
+        x, y, width, height = frame_rect(*image.size)
+        image = image.convert("RGB").crop((x, y, x + width, y + height))
+        return np.asarray(image.resize((size, size), Image.BILINEAR), dtype=np.uint8)
+    except Exception:
+        return None
+
+
+def _decode_with_qt(data, size):
+    from PyQt6.QtGui import QImage
+    image = read_scaled(data, size, size)
+    if image is None:
+        return None
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    row_bytes = image.bytesPerLine()
+    raw = np.frombuffer(image.constBits().asarray(row_bytes * size), dtype=np.uint8)
+    return raw.reshape(size, row_bytes)[:, :size * 3].reshape(size, size, 3).copy()
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def compute_features(pixels):
+    """Perceptual hash, brightness, contrast and dominant colors for a batch of images.
+
+    `pixels` is an (N, S, S, 3) uint8 array; every step is one array operation over the batch.
+    """
+    n = len(pixels)
+    rgb = pixels.astype(np.float32)
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    # pHash: low-frequency 2D DCT coefficients compared against their median (DC term excluded).
+    dct = _dct_matrix(luma.shape[1]).astype(np.float32)
+    low = (dct @ luma @ dct.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(n, -1)
+    bits = low > np.median(low[:, 1:], axis=1, keepdims=True)
+    hashes = np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+    shift = 8 - PALETTE_BITS
+    bins = 1 << (3 * PALETTE_BITS)
+    q = pixels.reshape(n, -1, 3) >> shift
+    codes = (q[..., 0].astype(np.int64) << (2 * PALETTE_BITS)) | (q[..., 1] << PALETTE_BITS) | q[..., 2]
+    codes += np.arange(n, dtype=np.int64)[:, None] * bins
+    flat = codes.ravel()
+    counts = np.bincount(flat, minlength=n * bins).reshape(n, bins)
+    sums = np.stack([np.bincount(flat, weights=rgb.reshape(-1, 3)[:, c], minlength=n * bins) for c in range(3)], -1)
+    top = np.argsort(-counts, axis=1, kind="stable")[:, :PALETTE_SIZE]
+    top_counts = np.take_along_axis(counts, top, axis=1)
+    colors = np.take_along_axis(sums.reshape(n, bins, 3), top[..., None], axis=1) / np.maximum(top_counts, 1)[..., None]
+    return {
+        "hashes": hashes,
+        "brightness": luma.mean(axis=(1, 2)) / 255,
+        "contrast": luma.std(axis=(1, 2)) / 255,
+        "palettes": np.rint(colors).astype(np.uint8),
+        "shares": top_counts / luma[0].size,
+    }
+
+
+def hamming_matrix(hashes):
+    xor = hashes[:, None] ^ hashes[None, :]
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor).astype(np.int64)
+    # NumPy < 2.0 has no popcount ufunc: count the set bits of each hash's 8 bytes instead.
+    return np.unpackbits(xor[..., None].view(np.uint8), axis=-1).sum(-1, dtype=np.int64)
+
+
+def collapse_near_duplicates(hashes, max_distance=NEAR_DUPLICATE_DISTANCE):
+    """Groups images whose hashes differ in at most `max_distance` bits.
+
+    Groups are led by the earliest image, so callers should pass images best-first.
+    """
+    distances = hamming_matrix(np.asarray(hashes, dtype=np.uint64))
+    assigned = np.zeros(len(distances), dtype=bool)
+    groups = []
+    for i in range(len(distances)):
+        if assigned[i]:
+            continue
+        members = np.flatnonzero(~assigned & (distances[i] <= max_distance))
+        assigned[members] = True
+        groups.append(members.tolist())
+    return groups
+
+
+def _to_records(features):
+    records = []
+    for i in range(len(features["hashes"])):
+        records.append({
+            "phash": f"{int(features['hashes'][i]):016x}",
+            "brightness": round(float(features["brightness"][i]), 4),
+            "contrast": round(float(features["contrast"][i]), 4),
+            "palette": [["#%02x%02x%02x" % tuple(int(c) for c in color), round(float(share), 4)]
+                        for color, share in zip(features["palettes"][i], features["shares"][i]) if share > 0],
+        })
+    return records
+
+
+def analyze_thumbnails(urls, fetch, cache=None, max_distance=NEAR_DUPLICATE_DISTANCE, max_workers=8):
+    """Features and near-duplicate groups for `urls`, ordered best-first.
+
+    `fetch(url)` returns image bytes or None. Features are cached per image in `cache`
+    (a ThumbnailCache), so a repeat analysis only reads small JSON records.
+    """
+    with TRACER.span("thumbnails.analyze", images=len(urls)) as span:
+        urls = list(dict.fromkeys(urls))
+        records = {}
+        missing = []
+        for url in urls:
+            cached = cache.get(url, FEATURE_VARIANT) if cache else None
+            if cached is not None:
+                records[url] = json.loads(cached)
+            else:
+                missing.append(url)
+
+        def load(url):
+            # A timeout or reset on one image must not sink the whole batch; it counts as failed.
+            try:
+                data = cache.get(url) if cache else None
+                if cache:
+                    cache.record_fetch(url, hit=data is not None)
+                if data is None:
+                    data = fetch(url)
+                    if data is not None and cache:
+                        cache.put(url, data)
+                return decode_thumbnail(data) if data else None
+            except Exception as e:
+                print(f"Thumbnail {url} skipped: {e}")
+                return None
+
+        decoded = []
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                decoded = [(url, pixels) for url, pixels in zip(missing, pool.map(load, missing)) if pixels is not None]
+        if decoded:
+            for (url, _), record in zip(decoded, _to_records(compute_features(np.stack([p for _, p in decoded])))):
+                records[url] = record
+                if cache:
+                    cache.put(url, json.dumps(record).encode("utf-8"), FEATURE_VARIANT)
+        span.set(cached=len(urls) - len(missing), decoded=len(decoded))
+
+        analyzed = [url for url in urls if url in records]
+        hashes = np.array([int(records[url]["phash"], 16) for url in analyzed], dtype=np.uint64)
+        groups = collapse_near_duplicates(hashes, max_distance) if len(hashes) else []
+        unique = [analyzed[group[0]] for group in groups]
+        return {
+            "unique_urls": unique + [url for url in urls if url not in records],
+            "duplicates": {analyzed[g[0]]: [analyzed[i] for i in g[1:]] for g in groups if len(g) > 1},
+            "features": records,
+            "palette": _overall_palette([records[url] for url in unique]),
+            "brightness": float(np.mean([records[url]["brightness"] for url in unique])) if unique else 0.0,
+            "contrast": float(np.mean([records[url]["contrast"] for url in unique])) if unique else 0.0,
+            "failed": len(urls) - len(analyzed),
+        }
+
+
+def _overall_palette(records, size=8):
+    """Most common dominant colors across images, after merging into the same coarse bins."""
+    weights = {}
+    for record in records:
+        for color, share in record["palette"]:
+            key = tuple(int(color[i:i + 2], 16) >> (8 - PALETTE_BITS) for i in (1, 3, 5))
+            entry = weights.setdefault(key, [0.0, color])
+            entry[0] += share
+    ranked = sorted(weights.values(), key=lambda entry: -entry[0])[:size]
+    total = sum(entry[0] for entry in ranked) or 1.0
+    return [[color, round(weight / total, 4)] for weight, color in ranked]
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_ENABLED = bool(os.environ.get('YOUTUBE_TRACE'))
+
+
+class _NullSpan:
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    recording = True
+    __slots__ = ("tracer", "name", "attrs", "start", "duration", "thread")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.duration = 0.0
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._record(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Records timed spans (duration plus attributes such as bytes, quota units, cache hit/miss).
+
+    While disabled, `span()` returns a shared no-op object, so instrumented code pays one
+    attribute check per stage. Check `span.recording` before computing costly attributes.
+    """
+
+    def __init__(self, enabled=False, max_spans=20000):
+        self.enabled = enabled
+        self.epoch = time.perf_counter()
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def now(self):
+        return time.perf_counter()
+
+    def _record(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def spans(self, since=None):
+        """Finished spans as dicts, oldest first; `since` is a `now()` value."""
+        with self._lock:
+            spans = list(self._spans)
+        return sorted((
+            {"name": s.name, "start_ms": (s.start - self.epoch) * 1000, "duration_ms": s.duration * 1000,
+             "thread": s.thread, **s.attrs}
+            for s in spans if since is None or s.start >= since
+        ), key=lambda s: s["start_ms"])
+
+    def chrome_trace(self, since=None):
+        """The spans in Chrome's Trace Event format (load in chrome://tracing or Perfetto)."""
+        events = []
+        for span in self.spans(since):
+            args = {k: v for k, v in span.items() if k not in ("name", "start_ms", "duration_ms", "thread")}
+            events.append({
+                "name": span["name"], "cat": span["name"].split(".")[0], "ph": "X", "pid": os.getpid(),
+                "tid": span["thread"], "ts": round(span["start_ms"] * 1000, 3),
+                "dur": round(span["duration_ms"] * 1000, 3), "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path, since=None):
+        """Writes a Chrome trace, or one JSON span per line when `path` ends in .jsonl."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                for span in self.spans(since):
+                    f.write(json.dumps(span) + "\n")
+            else:
+                json.dump(self.chrome_trace(since), f)
+
+
+TRACER = Tracer(enabled=TRACE_ENABLED)
@@ -0,0 +1,153 @@
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from youtube_core import (
+    MAX_IDS_PER_REQUEST, YouTubeResearcher, open_research_store, open_response_cache, open_scheduler
+)
+from youtube_quota import QUOTA_COSTS, QuotaExceededError
+from youtube_trace import TRACER
+
+REFRESH_INTERVAL = int(os.environ.get('YOUTUBE_WATCH_REFRESH', str(3600)))
+SEARCH_INTERVAL = int(os.environ.get('YOUTUBE_WATCH_SEARCH', str(7 * 24 * 3600)))
+# A failed topic search is retried after this many seconds, doubling per failure up to the search interval.
+SEARCH_RETRY_BASE = int(os.environ.get('YOUTUBE_WATCH_RETRY', str(300)))
+STATS_FIELDS = "items(id,statistics/viewCount)"
+
+
+def estimate_daily_units(topics, videos_per_topic=20, refresh_interval=REFRESH_INTERVAL,
+                         search_interval=SEARCH_INTERVAL, pages=1):
+    """Approximate quota units a watchlist spends per day.
+
+    Refreshes pack every tracked video of every due topic into 50-ID videos() calls; a search
+    costs its search pages plus one details call per 50 results (channel lookups, mostly
+    cached, are left out).
+    """
+    refresh_calls = -(-topics * videos_per_topic // MAX_IDS_PER_REQUEST)
+    search_units = pages * QUOTA_COSTS["search"] + -(-videos_per_topic // MAX_IDS_PER_REQUEST) * QUOTA_COSTS["videos"]
+    return round(refresh_calls * QUOTA_COSTS["videos"] * 86400 / refresh_interval
+                 + topics * search_units * 86400 / search_interval)
+
+
+class WatchlistMonitor:
+    """Keeps watched topics current without re-running their searches.
+
+    Each topic's video IDs come from its last search. Every `refresh_interval` their view
+    counts are re-read with 1-unit videos() calls, 50 IDs each across all due topics, and
+    velocity and rank changes are updated from the previous refresh. The 100-unit search
+    only re-runs every `search_interval` to pick up new entrants. All calls are background
+    calls, so the daemon never eats into the quota reserve kept for interactive searches.
+    """
+
+    def __init__(self, scheduler=None, store=None, response_cache=None, refresh_interval=REFRESH_INTERVAL,
+                 search_interval=SEARCH_INTERVAL, max_results=20):
+        self.scheduler = scheduler or open_scheduler()
+        self.store = store or open_research_store()
+        self.refresh_interval = refresh_interval
+        self.search_interval = search_interval
+        self.max_results = max_results
+        self.researcher = YouTubeResearcher(
+            self.scheduler, response_cache or open_response_cache(), self.store, background=True)
+        self.stop_event = threading.Event()
+
+    def run_once(self, now=None):
+        """Re-searches and refreshes whatever is due; returns a summary of the cycle."""
+        now = time.time() if now is None else now
+        summary = {"searched": 0, "new_videos": 0, "refreshed": 0, "video_calls": 0, "errors": {},
+                   "searches_deferred": False, "quota_exhausted": False}
+        try:
+            self._search_due(now, summary)
+            self._refresh_due(time.time(), summary)
+        except QuotaExceededError:
+            summary["quota_exhausted"] = True
+        summary["quota_remaining"] = self.scheduler.remaining()
+        return summary
+
+    def _search_due(self, now, summary):
+        for topic in self.store.watch_due("search", now - self.search_interval, now):
+            if self.stop_event.is_set():
+                break
+            if not self.scheduler.can_afford("search", 1, background=True):
+                # Refreshes are cheap enough to keep going; searches wait for the daily reset.
+                summary["searches_deferred"] = True
+                break
+            try:
+                with TRACER.span("watch.search", topic=topic):
+                    self.researcher.research(topic, max_results=self.max_results)
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                summary["errors"][topic] = str(e)
+                self.store.watch_search_failed(topic, SEARCH_RETRY_BASE, self.search_interval, time.time())
+                continue
+            summary["searched"] += 1
+            summary["new_videos"] += len(self.store.watch_sync(topic))
+
+    def _refresh_due(self, now, summary):
+        topics = self.store.watch_due("refresh", now - self.refresh_interval)
+        if not topics:
+            return
+        ids_by_topic = self.store.watch_video_ids(topics)
+        video_ids = list(dict.fromkeys(video_id for ids in ids_by_topic.values() for video_id in ids))
+        views = {}
+        with TRACER.span("watch.refresh", topics=len(topics), videos=len(video_ids)) as span:
+            try:
+                for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+                    if self.stop_event.is_set():
+                        break
+                    chunk = video_ids[start:start + MAX_IDS_PER_REQUEST]
+                    # Straight to the API: the response cache would hand back the counts being refreshed.
+                    response = self.scheduler.execute("videos", lambda service: service.videos().list(
+                        part="statistics", id=",".join(chunk), fields=STATS_FIELDS), background=True)
+                    summary["video_calls"] += 1
+                    views.update((item["id"], _views(item)) for item in response.get("items", []))
+                    # Removed or private videos are absent from the response; they keep their last count.
+                    views.update((video_id, None) for video_id in chunk if video_id not in views)
+            finally:
+                # Topics whose videos were all fetched are applied even if quota ran out mid-cycle.
+                complete = {topic: {video_id: views[video_id] for video_id in ids}
+                            for topic, ids in ids_by_topic.items() if all(video_id in views for video_id in ids)}
+                complete.update((topic, {}) for topic in topics if topic not in ids_by_topic)
+                if complete:
+                    self.store.watch_refresh(complete, now)
+                summary["refreshed"] = len(complete)
+                span.set(calls=summary["video_calls"], refreshed=len(complete))
+
+    def next_due(self, now=None, searches=True):
+        """Seconds until the next refresh (or, with `searches`, re-search) is due; 0 if one already is."""
+        now = time.time() if now is None else now
+        due = [now + self.refresh_interval]
+        for row in self.store.watch_topics():
+            if row["last_search_at"] is not None:
+                due.append((row["last_refresh_at"] or 0) + self.refresh_interval)
+            if searches:
+                due.append(max((row["last_search_at"] or 0) + self.search_interval, row["search_retry_at"] or 0))
+        return max(0.0, min(due) - now)
+
+    def run(self, out=sys.stdout, once=False):
+        """Runs cycles until stopped (SIGTERM or Ctrl+C), printing one JSON summary per cycle."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+        try:
+            while not self.stop_event.is_set():
+                summary = self.run_once()
+                summary["at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                print(json.dumps(summary, ensure_ascii=False), file=out, flush=True)
+                if once:
+                    break
+                # Out of quota: nothing can run again before the daily reset, checked hourly.
+                wait = 3600 if summary["quota_exhausted"] else self.next_due(
+                    searches=not summary["searches_deferred"])
+                if summary["searches_deferred"]:
+                    wait = min(wait, 3600)
+                self.stop_event.wait(max(wait, 1))
+        except KeyboardInterrupt:
+            self.stop_event.set()
+
+
+def _views(item):
+    views = item.get("statistics", {}).get("viewCount")
+    return int(views) if views is not None else None